@@ -0,0 +1,186 @@
+import heapq
+import hmac
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RAM_BUDGET_MB = int(os.getenv('ADMISSION_RAM_BUDGET_MB', '2048'))
+BROWSER_RAM_MB = int(os.getenv('ADMISSION_BROWSER_RAM_MB', '400'))
+MAX_BROWSERS = int(os.getenv('ADMISSION_MAX_BROWSERS', '0')) or None
+MAX_QUEUE_DEPTH = int(os.getenv('ADMISSION_MAX_QUEUE', '20'))
+MAX_CLIENT_QUEUE = int(os.getenv('ADMISSION_MAX_CLIENT_QUEUE', '3'))
+MAX_WAIT_SECONDS = float(os.getenv('ADMISSION_MAX_WAIT_SECONDS', '30'))
+
+
+def parse_weights(spec):
+    """Parse "client-a=2,client-b=0.5" into a weight per client id."""
+    weights = {}
+    for part in (spec or '').split(','):
+        if '=' in part:
+            client_id, weight = part.split('=', 1)
+            weights[client_id.strip()] = float(weight)
+    return weights
+
+
+CLIENT_WEIGHTS = parse_weights(os.getenv('ADMISSION_CLIENT_WEIGHTS'))
+
+
+def parse_keys(spec):
+    """Parse "client-a=key-a,client-b=key-b" into an API key per client id."""
+    keys = {}
+    for part in (spec or '').split(','):
+        if '=' in part:
+            client_id, key = part.split('=', 1)
+            keys[client_id.strip()] = key.strip()
+    return keys
+
+
+CLIENT_KEYS = parse_keys(os.getenv('ADMISSION_CLIENT_KEYS'))
+
+
+def client_identity(headers, remote_addr, keys=None):
+    """
+    The id a request is queued and weighted under. `X-Client-ID` is only
+    trusted with the matching `X-Client-Key`; otherwise any caller could
+    rotate ids for a fresh queue, or claim a partner's weight.
+    """
+    keys = CLIENT_KEYS if keys is None else keys
+    claimed = headers.get('X-Client-ID')
+    expected = keys.get(claimed) if claimed else None
+    if expected and hmac.compare_digest(headers.get('X-Client-Key', ''), expected):
+        return claimed
+    return remote_addr or 'anonymous'
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class Slot:
+    def __init__(self, controller, client_id, browsers):
+        self.controller = controller
+        self.client_id = client_id
+        self.browsers = browsers
+        self.started = time.monotonic()
+        self.released = False
+
+    def release(self):
+        self.controller._release(self)
+
+
+class AdmissionController:
+    """
+    Bounds concurrent Chromium instances to what the RAM budget allows and
+    shares them between clients with self-clocked weighted fair queuing:
+    each waiting request gets a finish tag of
+    max(virtual time, client's last tag) + cost / weight, and free browser
+    slots go to the smallest tag. A client sending many expensive requests
+    therefore waits behind clients sending few cheap ones.
+    """
+
+    def __init__(self, ram_budget_mb=RAM_BUDGET_MB, browser_ram_mb=BROWSER_RAM_MB, max_browsers=MAX_BROWSERS,
+                 max_queue=MAX_QUEUE_DEPTH, max_client_queue=MAX_CLIENT_QUEUE, weights=None):
+        self.capacity = max(1, ram_budget_mb // browser_ram_mb)
+        if max_browsers:
+            self.capacity = min(self.capacity, max_browsers)
+        self.max_queue = max_queue
+        self.max_client_queue = max_client_queue
+        self.weights = CLIENT_WEIGHTS if weights is None else weights
+        self.condition = threading.Condition()
+        self.in_use = 0
+        self.queue = []
+        self.queued_per_client = {}
+        self.last_tag = {}
+        self.virtual_time = 0.0
+        self.service_seconds = 60.0
+        self.sequence = itertools.count()
+        logger.info(f"Admission control: {self.capacity} browser slots, queue depth {self.max_queue}")
+
+    def _retry_after(self, ahead):
+        return max(1, math.ceil(self.service_seconds * (ahead + 1) / self.capacity))
+
+    def acquire(self, client_id, cost=1.0, browsers=1, timeout=MAX_WAIT_SECONDS):
+        """
+        Wait for `browsers` slots on behalf of `client_id`. `cost` is the
+        expected work (e.g. results requested) used for fairness. Raises
+        AdmissionRejected when the queue is full or the wait times out.
+        """
+        browsers = min(browsers, self.capacity)
+        weight = self.weights.get(client_id, 1.0)
+        with self.condition:
+            if self.queued_per_client.get(client_id, 0) >= self.max_client_queue:
+                raise AdmissionRejected("Too many queued requests for this client", self._retry_after(len(self.queue)))
+            if len(self.queue) >= self.max_queue:
+                raise AdmissionRejected("Server is at capacity", self._retry_after(len(self.queue)))
+
+            # Behind this client's admitted and still queued work
+            queued = max((queued_tag for queued_tag, _, client, _ in self.queue if client == client_id), default=0.0)
+            tag = max(self.virtual_time, self.last_tag.get(client_id, 0.0), queued) + cost / weight
+            entry = (tag, next(self.sequence), client_id, browsers)
+            heapq.heappush(self.queue, entry)
+            self.queued_per_client[client_id] = self.queued_per_client.get(client_id, 0) + 1
+
+            deadline = time.monotonic() + timeout
+            try:
+                while not (self.queue[0] is entry and self.in_use + browsers <= self.capacity):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.queue.remove(entry)
+                        heapq.heapify(self.queue)
+                        self.condition.notify_all()
+                        raise AdmissionRejected("Timed out waiting for a browser", self._retry_after(len(self.queue)))
+                    self.condition.wait(remaining)
+                heapq.heappop(self.queue)
+                self.virtual_time = tag
+                # Only admitted work counts against the client; tags behind the
+                # virtual time no longer affect anyone's place in the queue
+                self.last_tag[client_id] = tag
+                self.last_tag = {client: last for client, last in self.last_tag.items() if last > tag}
+                self.in_use += browsers
+            finally:
+                self.queued_per_client[client_id] -= 1
+                if not self.queued_per_client[client_id]:
+                    del self.queued_per_client[client_id]
+            # The next entry may fit in the slots that are still free
+            self.condition.notify_all()
+        return Slot(self, client_id, browsers)
+
+    def _release(self, slot):
+        with self.condition:
+            if slot.released:
+                return
+            slot.released = True
+            self.in_use -= slot.browsers
+            elapsed = time.monotonic() - slot.started
+            self.service_seconds = 0.8 * self.service_seconds + 0.2 * elapsed
+            self.condition.notify_all()
+
+    def status(self):
+        with self.condition:
+            return {
+                'capacity': self.capacity,
+                'in_use': self.in_use,
+                'queued': len(self.queue),
+                'avg_service_seconds': round(self.service_seconds, 1),
+            }
+
+
+def admitted(scrape, slot):
+    """Wrap a scrape function so its admission slot (if any) is released when it finishes."""
+    def run(*args, **kwargs):
+        try:
+            return scrape(*args, **kwargs)
+        finally:
+            if slot:
+                slot.release()
+    return run
+
+
+controller = AdmissionController()
@@ -1,17 +1,35 @@
-from flask import Flask, render_template, request, jsonify
-from playwright.sync_api import sync_playwright
-import pandas as pd
-import google.generativeai as genai
+from flask import Flask, Response, g, render_template, request, jsonify, send_from_directory, stream_with_context
 from dotenv import load_dotenv
 import os
 import logging
 import json
+import time
+import threading
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from prompt_parser import lookup_city, parse_prompt
+import result_store
+import job_queue
+import delivery
+import subsystems
+import profiling
+import admission
+from deferred import DeferredScrape
+from speculation import SPECULATIVE_SEARCH, SpeculativeSearch
+import extraction
+import tiling
+from prompts import (
+    ANALYSIS_GENERATION_CONFIG, LOCAL_PARSER_MIN_CONFIDENCE, MAX_CATEGORIES,
+    build_analysis_prompt, get_model, parse_analysis_categories
+)
+from maps_page import open_search
+from scraper import scrape_categories
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-import os
 app = Flask(__name__, 
             static_folder='static',
             template_folder='templates')
@@ -20,282 +38,350 @@ app = Flask(__name__,
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-try:
-    genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-    model = genai.GenerativeModel('gemini-2.0-flash')
-    logger.info("Gemini API configured successfully")
-except Exception as e:
-    logger.error(f"Failed to configure Gemini API: {str(e)}")
-    raise
-
-def analyze_prompt_for_job_fit(prompt):
-    analysis_prompt = f"""
-    Analyze the following user prompt to determine the most suitable type of business and location for job opportunities based on their skills, interests, or preferences:
-
-    Prompt: "{prompt}"
-
-    Provide the response in the following JSON format:
-    {{
-        "businessType": "[e.g., restaurant, tech company, retail]",
-        "location": "[e.g., New York, Bangalore]",
-        "reasoning": "[Brief explanation of why these choices were made]"
-    }}
-
-    If the prompt is vague, use "Local Business" for business type and "Nearby" for location.
+# Gemini, Playwright and pandas are initialized on first use (see subsystems.py);
+# set WARM_UP_ON_START=1 to initialize them in the background at startup instead
+USE_WORKER_QUEUE = os.getenv('SCRAPE_BACKEND', 'local') == 'queue'
+
+def analyze_prompt_categories(prompt, limit=MAX_CATEGORIES):
+    """Return (business types ranked by relevance, location) for the prompt."""
+    start = time.perf_counter()
+    local = parse_prompt(prompt)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if local.confidence >= LOCAL_PARSER_MIN_CONFIDENCE:
+        logger.info(f"Prompt analyzed locally in {elapsed_ms:.2f}ms: Business Types={local.business_types[:limit]}, Location={local.location}, Confidence={local.confidence}")
+        return local.business_types[:limit], local.location
+    logger.info(f"Local prompt analysis confidence {local.confidence} below {LOCAL_PARSER_MIN_CONFIDENCE}, falling back to Gemini")
+    business_types, location = analyze_prompt_with_gemini(prompt)
+    return business_types[:limit], location
+
+def start_speculation(prompt, client, total):
     """
-    try:
-        response = model.generate_content(
-            analysis_prompt,
-            generation_config={
-                "temperature": 0.5,
-                "max_output_tokens": 512
-            }
-        )
-        response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3].strip()
-        try:
-            data = json.loads(response_text)
-            business_type = data.get("businessType", "Local Business")
-            location = data.get("location", "Nearby")
-            if not business_type or not location:
-                logger.warning(f"Empty business type or location in Gemini response: {response_text}")
-                return "Local Business", "Nearby"
-            logger.info(f"Prompt analyzed: Business Type={business_type}, Location={location}")
-            return business_type, location
-        except json.JSONDecodeError:
-            logger.warning(f"Failed to parse Gemini response as JSON: {response_text}")
-            return "Local Business", "Nearby"
-    except Exception as e:
-        logger.error(f"Error analyzing prompt: {str(e)}")
-        return "Local Business", "Nearby"
-
-def generate_job_suggestions(business_name, business_type, location, description=""):
-    prompt = f"""
-    Generate 3 realistic and detailed job positions tailored to the following business based on its type, location, and description:
-
-    Business Name: {business_name}
-    Business Type: {business_type}
-    Location: {location}
-    Description: {description}
-
-    For each position, provide comprehensive details including:
-    1. Job Title (specific and relevant to the business)
-    2. Key Responsibilities (4-5 detailed points)
-    3. Required Qualifications/Skills (4-5 specific points)
-    4. Expected Salary Range (realistic Indian Rupees based on location and role)
-    5. Benefits and Perks
-    6. Experience Level Required
-    7. Working Hours/Schedule
-    8. Growth Opportunities
-
-    Return the response as a JSON array with exactly this structure:
-    [
-        {{
-            "jobTitle": "Specific Job Title Here",
-            "keyResponsibilities": [
-                "Detailed responsibility 1",
-                "Detailed responsibility 2", 
-                "Detailed responsibility 3",
-                "Detailed responsibility 4"
-            ],
-            "requiredSkills": [
-                "Specific skill/qualification 1",
-                "Specific skill/qualification 2",
-                "Specific skill/qualification 3", 
-                "Specific skill/qualification 4"
-            ],
-            "expectedSalaryRange": "₹XX,XXX - ₹XX,XXX per month",
-            "benefits": "Comprehensive benefits including health insurance, paid time off, bonuses, etc.",
-            "experienceLevel": "Entry Level / Mid Level / Senior Level",
-            "workingHours": "Working schedule and hours",
-            "growthOpportunities": "Career advancement and learning opportunities available"
-        }}
-    ]
-
-    Guidelines:
-    - Make job titles specific to the business type and realistic for the given location
-    - Include both technical and soft skills relevant to the industry
-    - Salary should reflect the Indian market, adjusting for location (e.g., higher for metros, lower for tier-2 cities)
-    - Ensure responsibilities are actionable and specific to the business
-    - Vary the positions across different levels or departments
-    - Ensure the response is valid JSON and tailored to the provided business details
+    When the prompt will go to Gemini for analysis, launch a browser meanwhile
+    if a browser slot is free right now. It opens the local parser's guess
+    when there is one (e.g. a city, with or without a business type), and
+    otherwise just waits on a blank page for the analysis.
     """
+    if not SPECULATIVE_SEARCH or extraction.get_extractor() is not None:
+        # The HTTP engine reads the first page without a browser, which is opened only on fallback
+        return None
+    local = parse_prompt(prompt)
+    if local.confidence >= LOCAL_PARSER_MIN_CONFIDENCE:
+        return None
     try:
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.7,
-                "max_output_tokens": 2048
-            }
-        )
-        response_text = response.text.strip()
-        logger.info(f"Raw job suggestion for {business_name}: {response_text[:200]}...")
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3].strip()
-        try:
-            job_data = json.loads(response_text)
-            if not isinstance(job_data, list) or not job_data:
-                logger.warning(f"Invalid job data for {business_name}: {response_text}")
-                return json.dumps([{"error": "Unable to generate valid job suggestions at this time"}])
-            logger.debug(f"Generated job suggestions for {business_name}: {json.dumps(job_data)}")
-            return json.dumps(job_data)
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse JSON for {business_name}: {response_text}")
-            return json.dumps([{"error": "Unable to generate valid job suggestions at this time"}])
-    except Exception as e:
-        logger.error(f"Error generating job suggestion for {business_name}: {str(e)}")
-        return json.dumps([{"error": "Unable to generate valid job suggestions at this time"}])
-
-def extract_coordinates(page):
-    url = page.url
-    if '@' in url:
-        coords = url.split('@')[1].split(',')[0:2]
-        return f"{coords[0]}, {coords[1]}"
-    return ""
-
-def extract_location_url(page):
-    return page.url
-
-def extract_description(page):
-    description_xpath = '//div[@class="WeS02d fontBodyMedium"]//div[@class="PYvSYb "]'
-    if page.locator(description_xpath).count() > 0:
-        return page.locator(description_xpath).inner_text()
-    return ""
-
-def scrape_jobs(business_type, location, total=5):
-    names_list = []
-    coordinates_list = []
-    phones_list = []
-    job_suggestions_list = []
-    descriptions_list = []
-    location_urls_list = []
-    seen_names = set()
-
-    full_search = f"{business_type} in {location}"
-    logger.info(f"Starting scrape for: {full_search}, Total={total}")
+        slot = admission.controller.acquire(client, cost=total, browsers=1, timeout=0)
+    except admission.AdmissionRejected:
+        return None
+    return SpeculativeSearch(open_search, local.business_type, local.location, slot).start()
 
+def analyze_prompt_with_gemini(prompt):
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto(f"https://www.google.com/maps/search/{full_search}", timeout=60000)
-            page.wait_for_timeout(3000)
-            logger.info("Navigated to Google Maps")
-            page.wait_for_selector('//a[contains(@href, "https://www.google.com/maps/place")]', timeout=30000)
-            logger.info("Search results loaded")
-
-            previously_counted = 0
-            while True:
-                page.mouse.wheel(0, 10000)
-                page.wait_for_timeout(2000)
-                current_count = page.locator('//a[contains(@href, "https://www.google.com/maps/place")]').count()
-                logger.info(f"Current results count: {current_count}")
-                if current_count >= total:
-                    listings = page.locator('//a[contains(@href, "https://www.google.com/maps/place")]').all()[:total]
-                    logger.info(f"Total found: {len(listings)}")
-                    break
-                elif current_count == previously_counted:
-                    listings = page.locator('//a[contains(@href, "https://www.google.com/maps/place")]').all()
-                    logger.info(f"Reached all available results: {len(listings)}")
-                    break
-                else:
-                    previously_counted = current_count
-
-            for i, listing in enumerate(listings):
-                try:
-                    logger.info(f"Processing listing {i+1}/{len(listings)}")
-                    listing.click()
-                    page.wait_for_timeout(3000)
-
-                    name_xpath = '//div[@class="TIHn2 "]//h1[@class="DUwDvf lfPIob"]'
-                    name = page.locator(name_xpath).inner_text() if page.locator(name_xpath).count() > 0 else "Not found"
-
-                    if name in seen_names:
-                        logger.info(f"Skipping duplicate business: {name}")
-                        continue
-                    seen_names.add(name)
-
-                    coords = extract_coordinates(page)
-                    location_url = extract_location_url(page)
-                    phone_xpath = '//button[contains(@data-item-id, "phone:tel:")]//div[contains(@class, "fontBodyMedium")]'
-                    phone = page.locator(phone_xpath).inner_text() if page.locator(phone_xpath).count() > 0 else "Not found"
-                    business_type_xpath = '//div[@class="LBgpqf"]//button[@class="DkEaL "]'
-                    scraped_business_type = page.locator(business_type_xpath).inner_text() if page.locator(business_type_xpath).count() > 0 else business_type
-                    description = extract_description(page)
-
-                    logger.info(f"Generating comprehensive job suggestions for {name}")
-                    job_suggestions = generate_job_suggestions(name, scraped_business_type, coords, description)
-                    logger.debug(f"Job suggestions for {name}: {job_suggestions}")  # Debug log to verify output
-
-                    names_list.append(name)
-                    coordinates_list.append(coords)
-                    phones_list.append(phone)
-                    descriptions_list.append(description)
-                    job_suggestions_list.append(job_suggestions)
-                    location_urls_list.append(location_url)
-
-                    logger.info(f"✓ Scraped comprehensive data for: {name}")
-                    page.keyboard.press("Escape")
-                    page.wait_for_timeout(1000)
-
-                    if len(names_list) >= total:
-                        break
-                except Exception as e:
-                    logger.error(f"Error processing listing {i+1}: {str(e)}")
-                    continue
-
-            browser.close()
-            logger.info("Browser closed")
-
+        response = get_model().generate_content(
+            build_analysis_prompt(prompt),
+            generation_config=ANALYSIS_GENERATION_CONFIG
+        )
+        return parse_analysis_categories(response.text)
     except Exception as e:
-        logger.error(f"Scraping failed: {str(e)}")
-        raise
-
-    df = pd.DataFrame({
-        'Business Name': names_list,
-        'Coordinates': coordinates_list,
-        'Phone Number': phones_list,
-        'Description': descriptions_list,
-        'Job Suggestions': job_suggestions_list,
-        'Location URL': location_urls_list
-    })
-
-    filename = 'business_jobs_with_urls.csv'
-    df.to_csv(filename, index=False)
-    logger.info(f"Data saved to {filename}")
-
-    return df.to_dict(orient='records'), business_type, location
+        logger.error(f"Error analyzing prompt: {str(e)}")
+        return ["Local Business"], "Nearby"
+
+def paged_results(business_type, location, results, page_size, session_id=None):
+    result_id = result_store.save_result_set(business_type, location, results)
+    response = {
+        'business_type': business_type,
+        'location': location,
+        'complete': True,
+        **delivery.paginate(result_id, results, 0, page_size)
+    }
+    if session_id:
+        response['session_id'] = session_id
+    return response
+
+@app.before_request
+def assign_request_id():
+    # Always our own id: it names the profile directory, which a client-chosen id could overwrite
+    g.request_id = uuid.uuid4().hex
+    client_request_id = request.headers.get('X-Request-ID')
+    g.client_request_id = client_request_id if profiling.valid_request_id(client_request_id) else None
+
+@app.after_request
+def compress(response):
+    response.headers['X-Request-ID'] = g.request_id
+    return delivery.compress_response(response, request.headers.get('Accept-Encoding'))
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    statuses = subsystems.statuses()
+    # ?ready=1 is for readiness probes: only answer 200 once everything is warm
+    if request.args.get('ready'):
+        ready = all(status['state'] == subsystems.READY for status in statuses.values())
+    else:
+        ready = all(status['state'] != subsystems.ERROR for status in statuses.values())
+    return jsonify({
+        'status': 'ok' if ready else 'unavailable',
+        'subsystems': statuses,
+        'admission': admission.controller.status()
+    }), 200 if ready else 503
+
+@app.route('/warmup', methods=['POST'])
+def warmup_subsystems():
+    names = (request.get_json(silent=True) or {}).get('subsystems')
+    return jsonify({'subsystems': subsystems.warm_up(names)})
 
 @app.route('/')
 def index():
     logger.info("Serving index page")
     return render_template('index.html')
 
+def client_id():
+    return admission.client_identity(request.headers, request.remote_addr)
+
+def too_many_requests(rejection):
+    logger.warning(f"Rejected request from {client_id()}: {str(rejection)}")
+    response = jsonify({'error': str(rejection), 'retry_after': rejection.retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(rejection.retry_after)
+    return response
+
 @app.route('/scrape', methods=['POST'])
 def scrape():
     logger.info("Received scrape request")
+    started = time.monotonic()
     data = request.json
     user_prompt = data.get('prompt', '')
-    total = min(max(int(data.get('total', 5)), 1), 50)
+    # A tiled crawl covers a whole city, so it may ask for far more places; it always runs on the workers
+    tiled = bool(data.get('tiled'))
+    total = min(max(int(data.get('total', 5)), 1), tiling.TILED_MAX_TOTAL if tiled else 50)
+    page_size = delivery.page_size_from(data.get('page_size', delivery.DEFAULT_PAGE_SIZE))
+    deadline_ms = data.get('deadline_ms')
 
-    if not user_prompt:
+    session_id = data.get('session_id')
+
+    if not user_prompt and not session_id:
         logger.warning("Empty prompt received")
         return jsonify({'error': 'Prompt is required'}), 400
 
+    speculation = None
+    launched = False
     try:
-        business_type, location = analyze_prompt_for_job_fit(user_prompt)
-        results, final_business_type, final_location = scrape_jobs(business_type, location, total)
+        if session_id:
+            # Continue an earlier query: only places beyond those already scraped cost anything
+            session = result_store.get_session(session_id)
+            if session is None:
+                return jsonify({'error': 'Unknown or expired session'}), 404
+            business_types, location = [session['business_type']], session['location']
+            if data.get('more'):
+                total = min(len(session['records']) + max(int(data['more']), 1), 50)
+        else:
+            limit = min(max(int(data.get('categories', MAX_CATEGORIES)), 1), MAX_CATEGORIES)
+            if not (tiled or data.get('queue', USE_WORKER_QUEUE)):
+                speculation = start_speculation(user_prompt, client_id(), total)
+            business_types, location = analyze_prompt_categories(user_prompt, limit=limit)
+        business_type = ', '.join(business_types)
+        if tiled and lookup_city(location) is None:
+            return jsonify({'error': f"Tiled crawls need a known city, got {location!r}"}), 400
+        # Sessions are per search; a fan-out over several categories cannot be continued as one
+        session_id = result_store.session_id(business_type, location) if len(business_types) == 1 and not tiled else None
+        result_store.log_query(business_type, location, total)
+        cached = result_store.get_results(business_type, location, total)
+        if cached is not None:
+            logger.info(f"Serving warm results for {business_type} in {location}")
+            return jsonify(paged_results(business_type, location, cached, page_size, session_id))
+        if tiled or data.get('queue', USE_WORKER_QUEUE):
+            task_id = job_queue.enqueue({'business_types': business_types, 'location': location, 'total': total, 'tiled': tiled})
+            return jsonify({
+                'business_type': business_type,
+                'location': location,
+                'task_id': task_id,
+                'status': job_queue.PENDING
+            }), 202
+        wait_limit = admission.MAX_WAIT_SECONDS
+        if deadline_ms is not None:
+            wait_limit = min(wait_limit, max(int(deadline_ms) / 1000 - (time.monotonic() - started), 0))
+        client = client_id()
+        slot = None
+        charged = speculation is not None
+        # Categories beyond `total` get no share of it and launch no browser
+        browsers = min(len(business_types), total)
+        if speculation and browsers > 1:
+            # Never wait for more slots while holding the speculative one, which
+            # other waiting requests may need: take the rest now or give it up
+            try:
+                slot = admission.controller.acquire(client, cost=0, browsers=browsers - 1, timeout=0)
+            except admission.AdmissionRejected:
+                logger.info(f"No free slots next to the speculative browser for {business_types}, releasing it")
+                speculation.cancel()
+                speculation = None
+        if speculation is None:
+            # A released speculative browser was already charged the request's cost
+            slot = admission.controller.acquire(client, cost=0 if charged else total,
+                                                browsers=browsers, timeout=wait_limit)
+        scrape_fn = admission.admitted(
+            lambda _, location, total, **kwargs: scrape_categories(business_types, location, total,
+                                                                   speculation=speculation, **kwargs),
+            slot
+        )
+        launched = True
+        if profiling.should_profile(request.headers):
+            scrape_fn = profiling.profiled(scrape_fn, g.request_id, f"{business_type} in {location} (total={total})",
+                                           g.client_request_id)
+        if deadline_ms is not None:
+            run = DeferredScrape(scrape_fn, business_type, location, total).start()
+            remaining = max(int(deadline_ms) / 1000 - (time.monotonic() - started), 0)
+            results, complete = run.wait(remaining)
+            if not complete:
+                logger.info(f"Deadline of {deadline_ms}ms reached with {len(results)} businesses, continuing in background as {run.result_id}")
+            elif run.error and not results:
+                return jsonify({'error': run.error}), 500
+            response = {
+                'business_type': business_type,
+                'location': location,
+                'business_types': business_types,
+                'session_id': session_id,
+                'complete': complete,
+                **delivery.paginate(run.result_id, results, 0, page_size)
+            }
+            if complete and run.error:
+                response['scrape_error'] = run.error
+            return jsonify(response)
+        results, final_business_type, final_location = scrape_fn(business_type, location, total)
+        result_store.save_results(business_type, location, total, results)
         logger.info("Comprehensive job scraping completed successfully")
         return jsonify({
-            'business_type': final_business_type,
-            'location': final_location,
-            'results': results
+            **paged_results(final_business_type, final_location, results, page_size, session_id),
+            'business_types': business_types
         })
+    except admission.AdmissionRejected as e:
+        return too_many_requests(e)
     except Exception as e:
         logger.error(f"Scrape endpoint failed: {str(e)}")
         return jsonify({'error': str(e)}), 500
+    finally:
+        # Served from cache, queued or rejected: the speculative browser is not needed
+        if speculation and not launched:
+            speculation.cancel()
+
+@app.route('/scrape/async', methods=['POST'])
+def scrape_async():
+    logger.info("Received async scrape request")
+    data = request.json
+    user_prompt = data.get('prompt', '')
+    total = min(max(int(data.get('total', 5)), 1), 50)
+    page_size = delivery.page_size_from(data.get('page_size', delivery.DEFAULT_PAGE_SIZE))
+    session_id = data.get('session_id')
+
+    if not user_prompt and not session_id:
+        logger.warning("Empty prompt received")
+        return jsonify({'error': 'Prompt is required'}), 400
+
+    from async_scraper import get_service
+    service = get_service()
+    if session_id:
+        session = result_store.get_session(session_id)
+        if session is None:
+            return jsonify({'error': 'Unknown or expired session'}), 404
+        business_types, location = [session['business_type']], session['location']
+        if data.get('more'):
+            total = min(len(session['records']) + max(int(data['more']), 1), 50)
+    else:
+        limit = min(max(int(data.get('categories', MAX_CATEGORIES)), 1), MAX_CATEGORIES)
+        business_types, location = service.submit(service.analyze_prompt_categories(user_prompt, limit=limit)).result()
+    business_type = ', '.join(business_types)
+    session_id = result_store.session_id(business_type, location) if len(business_types) == 1 else None
+    result_store.log_query(business_type, location, total)
+    cached = result_store.get_results(business_type, location, total)
+    if cached is not None:
+        logger.info(f"Serving warm results for {business_type} in {location}")
+        return jsonify(paged_results(business_type, location, cached, page_size, session_id))
+
+    try:
+        slot = admission.controller.acquire(client_id(), cost=total)
+    except admission.AdmissionRejected as e:
+        return too_many_requests(e)
+
+    future = service.submit(service.scrape_categories(business_types, location, total))
+    future.add_done_callback(lambda _: slot.release())
+
+    def generate():
+        try:
+            while True:
+                try:
+                    results, _, _ = future.result(timeout=5)
+                    break
+                except FutureTimeoutError:
+                    # Leading whitespace is valid JSON; if the client has gone
+                    # away this write fails and the finally block cancels the scrape
+                    yield ' '
+            result_store.save_results(business_type, location, total, results)
+            yield json.dumps({
+                **paged_results(business_type, location, results, page_size, session_id),
+                'business_types': business_types
+            })
+        except Exception as e:
+            logger.error(f"Async scrape failed: {str(e)}")
+            yield json.dumps({'error': str(e)})
+        finally:
+            if not future.done():
+                logger.info("Client disconnected, cancelling async scrape")
+                future.cancel()
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+@app.route('/tasks/<task_id>', methods=['GET'])
+def task_status(task_id):
+    task = job_queue.get(task_id)
+    if task is None:
+        return jsonify({'error': 'Unknown task'}), 404
+    response = {'task_id': task_id, 'status': task['status'], 'attempts': task['attempts']}
+    if task['status'] == job_queue.DONE:
+        result = task['result']
+        page_size = delivery.page_size_from(request.args.get('page_size', delivery.DEFAULT_PAGE_SIZE))
+        response.update(paged_results(result['business_type'], result['location'], result['results'], page_size))
+    elif task['status'] == job_queue.FAILED:
+        response['error'] = task['error']
+    return jsonify(response)
+
+@app.route('/results/<result_id>', methods=['GET'])
+def result_page(result_id):
+    result_set = result_store.get_result_set(result_id)
+    if result_set is None:
+        return jsonify({'error': 'Unknown result set'}), 404
+    try:
+        offset = delivery.decode_cursor(request.args['cursor'], result_id) if request.args.get('cursor') else 0
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    page_size = delivery.page_size_from(request.args.get('page_size', delivery.DEFAULT_PAGE_SIZE))
+
+    page = {
+        'business_type': result_set['business_type'],
+        'location': result_set['location'],
+        'complete': result_set['complete'],
+        **delivery.paginate(result_id, result_set['results'], offset, page_size)
+    }
+    if result_set['error']:
+        # The scrape failed part-way; these are the places found before it did
+        page['scrape_error'] = result_set['error']
+    response = jsonify(page)
+    # Weak because the body is re-encoded per client by compress()
+    response.add_etag(weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+@app.route('/admin/profiles', methods=['GET'])
+def admin_profiles():
+    if not profiling.is_admin(request.headers):
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({'profiles': profiling.list_profiles()})
+
+@app.route('/admin/profiles/<request_id>/<filename>', methods=['GET'])
+def admin_profile_file(request_id, filename):
+    if not profiling.is_admin(request.headers):
+        return jsonify({'error': 'Forbidden'}), 403
+    if not profiling.valid_request_id(request_id):
+        return jsonify({'error': 'Invalid request id'}), 400
+    return send_from_directory(os.path.abspath(os.path.join(profiling.PROFILE_DIR, request_id)), filename, as_attachment=True)
+
+if os.getenv('WARM_UP_ON_START') == '1':
+    threading.Thread(target=subsystems.warm_up, name='warm-up', daemon=True).start()
 
 if __name__ == '__main__':
     app.run()
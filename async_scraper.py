@@ -0,0 +1,276 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+
+from playwright.async_api import async_playwright
+
+import maps_page
+import prompts
+import result_store
+import scraper
+from prompt_parser import parse_prompt
+
+logger = logging.getLogger(__name__)
+
+ASYNC_BROWSERS = int(os.getenv('ASYNC_BROWSERS', '2'))
+PAGES_PER_BROWSER = int(os.getenv('ASYNC_PAGES_PER_BROWSER', '4'))
+GEMINI_CONCURRENCY = int(os.getenv('ASYNC_GEMINI_CONCURRENCY', '8'))
+
+
+class AsyncScrapeService:
+    """
+    Runs every async scrape on one event loop in a background thread. Scrapes
+    share a small pool of Chromium instances, each scrape getting its own
+    browser context, so many requests are multiplexed over few browsers.
+    """
+
+    def __init__(self, browsers=ASYNC_BROWSERS, pages_per_browser=PAGES_PER_BROWSER, gemini_concurrency=GEMINI_CONCURRENCY):
+        self.browser_count = browsers
+        self.pages_per_browser = pages_per_browser
+        self.gemini_concurrency = gemini_concurrency
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='async-scraper', daemon=True)
+        self.playwright = None
+        self.browsers = []
+        self.browser_load = []
+        self.ready = None
+
+    def start(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._setup_primitives(), self.loop).result()
+        logger.info(f"Async scrape service started: {self.browser_count} browsers x {self.pages_per_browser} pages")
+
+    async def _setup_primitives(self):
+        # Primitives must be created on the loop that uses them
+        self.ready = asyncio.Lock()
+        self.page_slots = asyncio.Semaphore(self.browser_count * self.pages_per_browser)
+        self.gemini_slots = asyncio.Semaphore(self.gemini_concurrency)
+
+    async def _ensure_browsers(self):
+        async with self.ready:
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+            while len(self.browsers) < self.browser_count:
+                self.browsers.append(await self.playwright.chromium.launch(headless=True))
+                self.browser_load.append(0)
+
+    async def _acquire_context(self):
+        await self.page_slots.acquire()
+        try:
+            await self._ensure_browsers()
+            index = min(range(len(self.browsers)), key=lambda i: self.browser_load[i])
+            if not self.browsers[index].is_connected():
+                logger.warning(f"Browser {index} disconnected, relaunching")
+                self.browsers[index] = await self.playwright.chromium.launch(headless=True)
+            self.browser_load[index] += 1
+            return index, await self.browsers[index].new_context()
+        except BaseException:
+            self.page_slots.release()
+            raise
+
+    async def _release_context(self, index, context):
+        self.browser_load[index] -= 1
+        self.page_slots.release()
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Failed to close browser context: {str(e)}")
+
+    async def analyze_prompt_categories(self, prompt, limit=prompts.MAX_CATEGORIES):
+        """Return (business types ranked by relevance, location) for the prompt."""
+        local = parse_prompt(prompt)
+        if local.confidence >= prompts.LOCAL_PARSER_MIN_CONFIDENCE:
+            return local.business_types[:limit], local.location
+        try:
+            async with self.gemini_slots:
+                response = await prompts.get_model().generate_content_async(
+                    prompts.build_analysis_prompt(prompt),
+                    generation_config=prompts.ANALYSIS_GENERATION_CONFIG
+                )
+            business_types, location = prompts.parse_analysis_categories(response.text)
+            return business_types[:limit], location
+        except Exception as e:
+            logger.error(f"Error analyzing prompt: {str(e)}")
+            return ["Local Business"], "Nearby"
+
+    async def generate_job_suggestions(self, business_name, business_type, location, description=""):
+        try:
+            prompt = prompts.build_job_prompt(business_name, business_type, location, description)
+            async with self.gemini_slots:
+                start = time.perf_counter()
+                response = await prompts.get_model().generate_content_async(
+                    prompt,
+                    generation_config=prompts.JOB_GENERATION_CONFIG
+                )
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            tokens_in, tokens_out = prompts.generation_usage(prompt, response)
+            logger.info(f"Job suggestions for {business_name}: {tokens_in} tokens in, {tokens_out} tokens out, {elapsed_ms:.0f}ms ({prompts.JOB_PROMPT_STYLE})")
+            return prompts.parse_job_response(business_name, response.text)
+        except Exception as e:
+            logger.error(f"Error generating job suggestion for {business_name}: {str(e)}")
+            return []
+
+    async def _enrich(self, record, business_type):
+        record['Job Suggestions'] = await self.generate_job_suggestions(
+            record['Business Name'], business_type, record['Coordinates'], record['Description']
+        )
+        record['Postings Status'] = scraper.READY_POSTINGS
+
+    async def scrape_jobs(self, business_type, location, total=5, session=None):
+        """
+        The async counterpart of scraper.scrape_jobs: the same records, and
+        the same query session, so places already scraped for this query are
+        reused rather than searched and enriched again.
+        """
+        session = (session
+                   or result_store.get_session(result_store.session_id(business_type, location))
+                   or scraper.new_session(business_type, location))
+        place_urls = session['place_urls']
+        known_records = session['records']
+        full_search = f"{business_type} in {location}"
+        need_search = len(place_urls) < total and not session['exhausted']
+        if not need_search and all(url in known_records for url in place_urls[:total]):
+            logger.info(f"All {min(total, len(place_urls))} places for {full_search} already scraped in this session")
+            return [dict(known_records[url]) for url in place_urls[:total]], business_type, location
+
+        logger.info(f"Starting async scrape for: {full_search}, Total={total}, already scraped={len(known_records)}")
+        index, context = await self._acquire_context()
+        records = []
+        seen_names = set()
+        enrichments = []
+        try:
+            page = await context.new_page()
+            listings_by_url = {}
+            if need_search:
+                await maps_page.open_search_async(page, full_search)
+                listings, exhausted = await maps_page.scroll_feed_async(page, total)
+                if exhausted:
+                    session['exhausted'] = True
+                for listing in listings:
+                    place_url = await listing.get_attribute('href')
+                    listings_by_url[place_url] = listing
+                    if place_url not in place_urls:
+                        place_urls.append(place_url)
+
+            targets = place_urls[:total]
+            for i, place_url in enumerate(targets):
+                if place_url in known_records:
+                    record = dict(known_records[place_url])
+                    records.append(record)
+                    seen_names.add(record['Business Name'])
+                    continue
+                try:
+                    if place_url in listings_by_url:
+                        await listings_by_url[place_url].click()
+                    else:
+                        # Known from an earlier search in this session; open it directly
+                        await page.goto(place_url, timeout=60000)
+                    await page.wait_for_timeout(3000)
+                    name = await maps_page.text_or_default(page, maps_page.NAME_XPATH, "Not found")
+                    if name in seen_names:
+                        logger.info(f"Skipping duplicate business: {name}")
+                        continue
+                    seen_names.add(name)
+
+                    place = await maps_page.extract_place_async(page, name, business_type)
+                    record = scraper.record_from_place(place)
+                    records.append(record)
+                    known_records[place_url] = record
+                    # Generate postings while the page moves on to the next listing
+                    enrichments.append(asyncio.ensure_future(self._enrich(record, place['category'])))
+
+                    await page.keyboard.press("Escape")
+                    await page.wait_for_timeout(1000)
+                    if len(records) >= total:
+                        break
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error processing listing {i+1}: {str(e)}")
+        except BaseException:
+            for task in enrichments:
+                task.cancel()
+            raise
+        finally:
+            await self._release_context(index, context)
+
+        await asyncio.gather(*enrichments)
+        result_store.save_session(session)
+        return records, business_type, location
+
+    async def scrape_categories(self, business_types, location, total=5):
+        """
+        The async counterpart of scraper.scrape_categories: split `total`
+        between the categories, search them concurrently and merge them into
+        one ranked list, topping up categories to replace duplicates.
+        """
+        if len(business_types) == 1:
+            return await self.scrape_jobs(business_types[0], location, total)
+
+        quotas = scraper.split_total(total, len(business_types))
+        logger.info(f"Fanning out async {location} search over {business_types}, {quotas} results each")
+
+        async def category(index):
+            if not quotas[index]:
+                return []
+            try:
+                return (await self.scrape_jobs(business_types[index], location, quotas[index]))[0]
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Category {business_types[index]} failed: {str(e)}")
+                return []
+
+        result_lists = list(await asyncio.gather(*(category(index) for index in range(len(business_types)))))
+        if not any(result_lists):
+            raise RuntimeError(f"All category searches failed for {location}")
+        records = scraper.merge_ranked(result_lists, total)
+
+        for index, business_type in enumerate(business_types):
+            if len(records) >= total:
+                break
+            if len(result_lists[index]) < quotas[index]:
+                continue
+            quotas[index] += total - len(records)
+            logger.info(f"Topping up {business_type} in {location} to {quotas[index]} places to replace duplicates")
+            topped_up = await category(index)
+            if topped_up:
+                result_lists[index] = topped_up
+                records = scraper.merge_ranked(result_lists, total)
+
+        return records, ', '.join(business_types), location
+
+    def submit(self, coro):
+        """Schedule a coroutine on the service loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def _shutdown(self):
+        for browser in self.browsers:
+            await browser.close()
+        if self.playwright is not None:
+            await self.playwright.stop()
+
+    def stop(self):
+        if self.thread.is_alive():
+            try:
+                self.submit(self._shutdown()).result(timeout=30)
+            except Exception as e:
+                logger.warning(f"Async scrape service shutdown failed: {str(e)}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = AsyncScrapeService()
+            _service.start()
+            atexit.register(_service.stop)
+        return _service
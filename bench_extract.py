@@ -0,0 +1,56 @@
+import argparse
+import resource
+import time
+
+import maps_page
+import extraction
+import subsystems
+
+
+def usage():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+    return time.perf_counter(), cpu, max(own.ru_maxrss, children.ru_maxrss)
+
+
+def bench_http(place_urls):
+    extractor = extraction.HttpExtractor()
+    for place_url in place_urls:
+        extractor.place(place_url)
+
+
+def bench_browser(place_urls):
+    sync_playwright = subsystems.playwright.get()
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_context().new_page()
+        for place_url in place_urls:
+            page.goto(place_url, timeout=60000)
+            page.wait_for_timeout(3000)
+            page.locator(maps_page.NAME_XPATH).count() and page.locator(maps_page.NAME_XPATH).inner_text()
+            page.locator(maps_page.PHONE_XPATH).count() and page.locator(maps_page.PHONE_XPATH).inner_text()
+            maps_page.extract_description(page)
+        browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-place cost of the HTTP and browser extraction engines")
+    parser.add_argument('query', help='e.g. "restaurant in Hyderabad"')
+    parser.add_argument('--places', type=int, default=5)
+    args = parser.parse_args()
+
+    places, _ = extraction.HttpExtractor().search(args.query)
+    place_urls = [place['place_url'] for place in places[:args.places]]
+    print(f"{'engine':<10}{'ms/place':>12}{'cpu ms/place':>14}{'peak rss MB':>14}")
+    # The browser runs last so its child processes do not inflate the HTTP peak
+    for name, bench in (('http', bench_http), ('browser', bench_browser)):
+        start_wall, start_cpu, _ = usage()
+        bench(place_urls)
+        wall, cpu, peak_kb = usage()
+        count = len(place_urls)
+        print(f"{name:<10}{(wall - start_wall) * 1000 / count:>12.0f}{(cpu - start_cpu) * 1000 / count:>14.0f}{peak_kb / 1024:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
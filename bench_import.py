@@ -0,0 +1,57 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ['app', 'prompt_parser', 'result_store', 'job_queue', 'warmup', 'worker']
+
+
+def import_time_ms(module, runs):
+    """Median wall time of `import <module>` in a fresh interpreter, in ms."""
+    code = f"import time; s = time.perf_counter(); import {module}; print((time.perf_counter() - s) * 1000)"
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def slowest_imports(module, top):
+    """The `top` slowest imports pulled in by `module`, from python -X importtime."""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"], capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of the app modules")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help="Also list the N slowest nested imports")
+    args = parser.parse_args()
+
+    print(f"{'module':<16}{'median ms':>12}")
+    for module in args.modules:
+        try:
+            print(f"{module:<16}{import_time_ms(module, args.runs):>12.1f}")
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<16}{'failed':>12}  {e.stderr.strip().splitlines()[-1]}")
+            continue
+        for cumulative_us, name in slowest_imports(module, args.top):
+            print(f"    {name:<40}{cumulative_us / 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
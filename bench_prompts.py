@@ -0,0 +1,53 @@
+import argparse
+import statistics
+import time
+
+import prompts
+
+SAMPLE_BUSINESSES = [
+    ('Sharma Dhaba', 'restaurant', 'Ludhiana', 'Punjabi food, open 24 hours'),
+    ('City Care Hospital', 'hospital', 'Pune', 'Multi-speciality hospital'),
+    ('Balaji Auto Works', 'car repair shop', 'Chennai', ''),
+]
+
+
+def measure(style, runs):
+    """Median tokens in/out and latency per job-suggestion call for one prompt style."""
+    build, config, parser = prompts.JOB_PROMPT_STYLES[style]
+    model = prompts.get_model()
+    tokens_in, tokens_out, latencies, postings = [], [], [], 0
+    for _ in range(runs):
+        for business in SAMPLE_BUSINESSES:
+            prompt = build(*business)
+            start = time.perf_counter()
+            response = model.generate_content(prompt, generation_config=config)
+            latencies.append((time.perf_counter() - start) * 1000)
+            used_in, used_out = prompts.generation_usage(prompt, response)
+            tokens_in.append(used_in)
+            tokens_out.append(used_out)
+            postings += len(prompts.parse_job_response(business[0], response.text, parser))
+    return {
+        'tokens_in': statistics.median(tokens_in),
+        'tokens_out': statistics.median(tokens_out),
+        'latency_ms': statistics.median(latencies),
+        'postings': postings / (runs * len(SAMPLE_BUSINESSES)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare token use and latency of the job prompt styles")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    stats = {style: measure(style, args.runs) for style in prompts.JOB_PROMPT_STYLES}
+    print(f"{'style':<10}{'tokens in':>12}{'tokens out':>12}{'latency ms':>12}{'postings':>10}")
+    for style, row in stats.items():
+        print(f"{style:<10}{row['tokens_in']:>12.0f}{row['tokens_out']:>12.0f}{row['latency_ms']:>12.0f}{row['postings']:>10.1f}")
+
+    verbose, compact = stats['verbose'], stats['compact']
+    saved = (verbose['tokens_in'] + verbose['tokens_out']) - (compact['tokens_in'] + compact['tokens_out'])
+    print(f"\ncompact saves {saved:.0f} tokens and {verbose['latency_ms'] - compact['latency_ms']:.0f} ms per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import logging
+import threading
+import uuid
+
+import result_store
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredScrape:
+    """
+    Runs a scrape in a background thread and mirrors its progress into a
+    result set, so a request can return a partial snapshot at its deadline
+    while the scrape and its enrichment keep going.
+    """
+
+    def __init__(self, scrape, business_type, location, total):
+        self.scrape = scrape
+        self.business_type = business_type
+        self.location = location
+        self.total = total
+        self.result_id = uuid.uuid4().hex[:16]
+        self.results = []
+        self.error = None
+        self.finished = False
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"scrape-{self.result_id}", daemon=True)
+
+    def start(self):
+        result_store.put_result_set(self.result_id, self.business_type, self.location, [], complete=False)
+        self.thread.start()
+        return self
+
+    def _update(self, results):
+        # scrape_jobs calls this under its records lock, so snapshots arrive in order
+        with self.lock:
+            if self.finished:
+                return
+            self.results = results
+            result_store.put_result_set(self.result_id, self.business_type, self.location, results, complete=False)
+
+    def _finish(self, business_type, location, results, error=None):
+        with self.lock:
+            self.finished = True
+            self.results = results
+            result_store.put_result_set(self.result_id, business_type, location, results, complete=True, error=error)
+
+    def _run(self):
+        try:
+            results, business_type, location = self.scrape(self.business_type, self.location, self.total, on_update=self._update)
+            self._finish(business_type, location, results)
+            result_store.save_results(business_type, location, self.total, results)
+            logger.info(f"Deferred scrape {self.result_id} completed with {len(results)} results")
+        except Exception as e:
+            self.error = str(e)
+            # Keep whatever was scraped before the failure, and say why it stops there
+            self._finish(self.business_type, self.location, self.results, self.error)
+            logger.error(f"Deferred scrape {self.result_id} failed: {str(e)}")
+        finally:
+            self.done.set()
+
+    def wait(self, timeout):
+        """Wait up to `timeout` seconds; returns (results snapshot, complete)."""
+        complete = self.done.wait(timeout)
+        with self.lock:
+            return [dict(record) for record in self.results], complete
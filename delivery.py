@@ -0,0 +1,140 @@
+import base64
+import gzip
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+MIN_COMPRESS_BYTES = 512
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/css', 'application/javascript', 'text/javascript')
+
+
+def encode_cursor(result_id, offset):
+    return base64.urlsafe_b64encode(f"{result_id}:{offset}".encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, result_id):
+    """Return the offset a cursor points at, or raise ValueError if it is not for this result set."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_result_id, offset = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').rsplit(':', 1)
+        offset = int(offset)
+    except Exception:
+        raise ValueError("Malformed cursor")
+    if cursor_result_id != result_id or offset < 0:
+        raise ValueError("Cursor does not belong to this result set")
+    return offset
+
+
+def page_size_from(value):
+    try:
+        return min(max(int(value), 1), MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+
+
+def paginate(result_id, results, offset=0, page_size=DEFAULT_PAGE_SIZE):
+    end = offset + page_size
+    return {
+        'result_id': result_id,
+        'total_results': len(results),
+        'results': results[offset:end],
+        'next_cursor': encode_cursor(result_id, end) if end < len(results) else None
+    }
+
+
+def _accepted_encodings(header):
+    encodings = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            encodings[name.lower()] = q
+    return encodings
+
+
+def _choose_encoding(accept_encoding):
+    accepted = _accepted_encodings(accept_encoding)
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+# (ETag, encoding) -> compressed body of a static file; the ETag changes with the file
+_static_cache = {}
+STATIC_CACHE_ENTRIES = 64
+
+
+def _compressed_file(response, encoding):
+    etag, _ = response.get_etag()
+    compressed = _static_cache.get((etag, encoding)) if etag else None
+    if compressed is not None:
+        response.close()
+        return compressed
+    response.direct_passthrough = False
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return None
+    compressed = _compress(body, encoding)
+    if etag:
+        if len(_static_cache) >= STATIC_CACHE_ENTRIES:
+            _static_cache.clear()
+        _static_cache[(etag, encoding)] = compressed
+    return compressed
+
+
+def compress_response(response, accept_encoding):
+    """
+    Compress a Flask response body with brotli (when installed) or gzip if
+    the client accepts it. Static files are compressed once per version and
+    encoding; streamed, partial, already-encoded, small and non-text
+    responses are left alone.
+    """
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    encoding = _choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    if response.direct_passthrough:
+        # A file from send_file/static; the ETag becomes weak since each encoding has its own bytes
+        compressed = _compressed_file(response, encoding)
+        if compressed is None:
+            return response
+        etag, _ = response.get_etag()
+        if etag:
+            response.set_etag(etag, weak=True)
+    elif response.is_streamed:
+        return response
+    else:
+        body = response.get_data()
+        if len(body) < MIN_COMPRESS_BYTES:
+            return response
+        compressed = _compress(body, encoding)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(compressed))
+    response.vary.add('Accept-Encoding')
+    return response
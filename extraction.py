@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import re
+from urllib.parse import quote, quote_plus
+
+import subsystems
+
+logger = logging.getLogger(__name__)
+
+# 'browser' always renders with Playwright; 'http' reads place data straight from the page payloads
+EXTRACTION_ENGINE = os.getenv('EXTRACTION_ENGINE', 'browser')
+# Point at a local stand-in server with recorded pages to exercise the engine offline
+MAPS_BASE_URL = os.getenv('MAPS_BASE_URL', 'https://www.google.com').rstrip('/')
+HTTP_TIMEOUT_SECONDS = float(os.getenv('HTTP_TIMEOUT_SECONDS', '15'))
+# Results in the first page of a Maps feed; fewer than this means the feed is exhausted
+FEED_PAGE_SIZE = 20
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+    'Accept-Language': 'en-IN,en;q=0.9',
+}
+
+_STATE_RE = re.compile(r"window\.APP_INITIALIZATION_STATE\s*=\s*(\[.*?\]);\s*window\.APP_FLAGS", re.DOTALL)
+_XSSI_PREFIX = ")]}'"
+
+
+class ExtractionError(Exception):
+    pass
+
+
+def search_url(full_search, viewport=None, base_url=None):
+    url = f"{base_url or MAPS_BASE_URL}/maps/search/{quote(full_search)}"
+    if viewport:
+        lat, lng, zoom = viewport
+        url += f"/@{lat:.6f},{lng:.6f},{zoom}z"
+    return url
+
+
+def dig(data, *path):
+    """data[path[0]][path[1]]..., or None as soon as a step is missing."""
+    for index in path:
+        if not isinstance(data, list) or not -len(data) <= index < len(data):
+            return None
+        data = data[index]
+    return data
+
+
+def _payload(text):
+    if not isinstance(text, str) or not text.startswith(_XSSI_PREFIX):
+        return None
+    return json.loads(text[len(_XSSI_PREFIX):])
+
+
+def _looks_like_place(data):
+    return isinstance(dig(data, 11), str) and isinstance(dig(data, 9), list)
+
+
+def place_from_payload(data, fallback_category=""):
+    """Map one place array from a Maps payload to the fields scrape_jobs() records."""
+    if not _looks_like_place(data):
+        raise ExtractionError("Payload does not describe a place")
+    lat, lng = dig(data, 9, 2), dig(data, 9, 3)
+    feature_id = dig(data, 10)
+    name = data[11]
+    place_url = (f"{MAPS_BASE_URL}/maps/place/{quote_plus(name)}/data=!4m2!3m1!1s{feature_id}"
+                 if feature_id else f"{MAPS_BASE_URL}/maps/search/{quote(name)}")
+    return {
+        'place_url': place_url,
+        'location_url': place_url,
+        'name': name,
+        'coordinates': f"{lat}, {lng}" if lat is not None and lng is not None else "",
+        'phone': str(dig(data, 178, 0, 0) or "Not found"),
+        'category': str(dig(data, 13, 0) or fallback_category),
+        'description': str(dig(data, 32, 1, 1) or ""),
+    }
+
+
+class HttpExtractor:
+    """
+    Browserless engine: fetches Maps search and place pages over the pooled
+    HTTP session and reads the data payloads embedded in them, instead of
+    rendering the page and querying the DOM. Raises ExtractionError whenever
+    a page does not have the expected shape, so callers can fall back to
+    the Playwright path.
+    """
+
+    name = 'http'
+
+    def _state(self, url):
+        try:
+            response = subsystems.http.get().get(url, headers=HEADERS, params={'hl': 'en'}, timeout=HTTP_TIMEOUT_SECONDS)
+            response.raise_for_status()
+        except Exception as e:
+            raise ExtractionError(f"Fetching {url} failed: {str(e)}")
+        match = _STATE_RE.search(response.text)
+        if not match:
+            raise ExtractionError(f"No embedded state in {url}")
+        try:
+            return json.loads(match.group(1))
+        except ValueError as e:
+            raise ExtractionError(f"Unreadable embedded state in {url}: {str(e)}")
+
+    def search(self, full_search, fallback_category="", viewport=None):
+        """
+        Return (places in feed order, whether the feed has no more results).
+        `viewport` is an optional (lat, lng, zoom) to search within.
+        """
+        state = self._state(search_url(full_search, viewport))
+        try:
+            data = _payload(dig(state, 3, 2))
+        except ValueError as e:
+            raise ExtractionError(f"Unreadable search payload for {full_search}: {str(e)}")
+        entries = dig(data, 0, 1) or dig(data, 64) or []
+        places = []
+        for entry in entries:
+            # The place array sits at [14] in older payloads and [1] in newer ones
+            candidate = next((dig(entry, i) for i in (14, 1) if _looks_like_place(dig(entry, i))), None)
+            if candidate is not None:
+                places.append(place_from_payload(candidate, fallback_category))
+        if data is None or (entries and not places):
+            raise ExtractionError(f"Search payload for {full_search} has an unexpected shape")
+        logger.info(f"HTTP search for {full_search} returned {len(places)} places")
+        return places, len(places) < FEED_PAGE_SIZE
+
+    def place(self, place_url, fallback_category=""):
+        state = self._state(place_url)
+        try:
+            data = _payload(dig(state, 3, 6))
+        except ValueError as e:
+            raise ExtractionError(f"Unreadable place payload for {place_url}: {str(e)}")
+        place = place_from_payload(dig(data, 6), fallback_category)
+        # Keep the URL the session already knows this place by
+        place['place_url'] = place['location_url'] = place_url
+        return place
+
+
+ENGINES = {
+    'http': HttpExtractor,
+}
+
+
+def get_extractor():
+    """The configured browserless engine, or None when only the browser should be used."""
+    engine = ENGINES.get(EXTRACTION_ENGINE)
+    return engine() if engine else None
@@ -0,0 +1,151 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+
+import result_store
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DB_PATH = os.getenv('JOB_QUEUE_DB', result_store.DB_PATH)
+DEFAULT_LEASE_SECONDS = int(os.getenv('JOB_QUEUE_LEASE_SECONDS', '120'))
+MAX_ATTEMPTS = int(os.getenv('JOB_QUEUE_MAX_ATTEMPTS', '3'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_tasks (
+    task_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scrape_tasks_status ON scrape_tasks (status, created_at);
+"""
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+@contextmanager
+def connect(path=None):
+    # isolation_level=None so that BEGIN IMMEDIATE below takes the write lock
+    # before reading, making claim() atomic across processes
+    conn = sqlite3.connect(path or QUEUE_DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.executescript(SCHEMA)
+        yield conn
+    finally:
+        conn.close()
+
+
+def _row_to_task(row):
+    task = dict(row)
+    task['payload'] = json.loads(task['payload'])
+    if task['result'] is not None:
+        task['result'] = json.loads(task['result'])
+    return task
+
+
+def enqueue(payload):
+    task_id = uuid.uuid4().hex
+    now = time.time()
+    with connect() as conn:
+        conn.execute(
+            "INSERT INTO scrape_tasks (task_id, payload, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (task_id, json.dumps(payload), PENDING, now, now),
+        )
+    logger.info(f"Enqueued scrape task {task_id}: {payload}")
+    return task_id
+
+
+def get(task_id):
+    with connect() as conn:
+        row = conn.execute("SELECT * FROM scrape_tasks WHERE task_id = ?", (task_id,)).fetchone()
+    return _row_to_task(row) if row else None
+
+
+def claim(worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Lease the oldest runnable task to `worker_id`. A task is runnable when it
+    is pending or its previous lease expired (the worker died or stalled).
+    Tasks whose lease expired after MAX_ATTEMPTS are marked failed instead.
+    """
+    now = time.time()
+    with connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE scrape_tasks SET status = ?, error = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, 'lease expired too many times', now, LEASED, now, MAX_ATTEMPTS),
+            )
+            row = conn.execute(
+                "SELECT * FROM scrape_tasks WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (PENDING, LEASED, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row['status'] == LEASED:
+                logger.warning(f"Lease of task {row['task_id']} held by {row['lease_owner']} expired, retrying")
+            conn.execute(
+                "UPDATE scrape_tasks SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE task_id = ?",
+                (LEASED, worker_id, now + lease_seconds, now, row['task_id']),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    task = _row_to_task(row)
+    task['attempts'] += 1
+    return task
+
+
+def heartbeat(task_id, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Extend the lease; returns False if the worker no longer owns the task."""
+    now = time.time()
+    with connect() as conn:
+        cursor = conn.execute(
+            "UPDATE scrape_tasks SET lease_expires = ?, updated_at = ? WHERE task_id = ? AND lease_owner = ? AND status = ?",
+            (now + lease_seconds, now, task_id, worker_id, LEASED),
+        )
+    return cursor.rowcount == 1
+
+
+def complete(task_id, worker_id, result):
+    now = time.time()
+    with connect() as conn:
+        cursor = conn.execute(
+            "UPDATE scrape_tasks SET status = ?, result = ?, lease_owner = NULL, updated_at = ? "
+            "WHERE task_id = ? AND lease_owner = ? AND status = ?",
+            (DONE, json.dumps(result), now, task_id, worker_id, LEASED),
+        )
+    if cursor.rowcount != 1:
+        logger.warning(f"Worker {worker_id} lost the lease on task {task_id} before completing it")
+        return False
+    return True
+
+
+def fail(task_id, worker_id, error):
+    """Release a failed task for retry, or mark it failed after MAX_ATTEMPTS."""
+    now = time.time()
+    with connect() as conn:
+        conn.execute(
+            "UPDATE scrape_tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE task_id = ? AND lease_owner = ? AND status = ?",
+            (MAX_ATTEMPTS, FAILED, PENDING, error, now, task_id, worker_id, LEASED),
+        )
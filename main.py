@@ -1,118 +1,109 @@
-from playwright.sync_api import sync_playwright
-from dataclasses import dataclass, asdict, field
-import pandas as pd
-import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+import argparse
+import csv
+import json
 import os
-import time
+import sys
+import threading
+
+import storage
+import subsystems
+from maps_page import NAME_XPATH, extract_place, open_search, scroll_feed
+from prompt_parser import parse_prompt
+from prompts import (
+    ANALYSIS_GENERATION_CONFIG, JOB_GENERATION_CONFIG, LOCAL_PARSER_MIN_CONFIDENCE,
+    build_analysis_prompt, build_job_prompt, get_model, parse_analysis_response, parse_job_response
+)
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-model = genai.GenerativeModel('gemini-2.0-flash')
-
-# Lists to store data
-names_list = []
-coordinates_list = []
-phones_list = []
-job_suggestions_list = []
-descriptions_list = []
-location_urls_list = []  # New list to store location URLs
-
 def analyze_prompt_for_job_fit(prompt):
     """
-    Use Gemini to analyze the user's prompt and determine suitable business type and location.
-    """
-    analysis_prompt = f"""
-    Analyze the following user prompt to determine the most suitable type of business and location for them to work at based on their skills, interests, or preferences:
-
-    Prompt: "{prompt}"
-
-    Provide the response in the following format:
-    - Business Type: [e.g., restaurant, tech company, retail]
-    - Location: [e.g., New York, Bangalore]
-    - Reasoning: [Brief explanation of why these choices were made]
-
-    Ensure the business type and location are realistic and appropriate for job opportunities.
+    Determine the business type and location for the user's prompt, locally
+    when the prompt parser is confident enough and with Gemini otherwise.
     """
+    local = parse_prompt(prompt)
+    if local.confidence >= LOCAL_PARSER_MIN_CONFIDENCE:
+        return local.business_type, local.location
     try:
-        response = model.generate_content(analysis_prompt)
-        response_text = response.text.strip()
-
-        # Parse the response to extract Business Type and Location
-        business_type = ""
-        location = ""
-        lines = response_text.split('\n')
-        for line in lines:
-            if line.startswith('- Business Type:'):
-                business_type = line.replace('- Business Type:', '').strip()
-            elif line.startswith('- Location:'):
-                location = line.replace('- Location:', '').strip()
-
-        if not business_type or not location:
-            raise ValueError("Could not extract business type or location from Gemini response.")
-
-        return business_type, location
+        response = get_model().generate_content(build_analysis_prompt(prompt), generation_config=ANALYSIS_GENERATION_CONFIG)
+        return parse_analysis_response(response.text)
     except Exception as e:
         print(f"Error analyzing prompt: {str(e)}")
         return "Local Business", "Nearby"  # Fallback values
 
 def generate_job_suggestions(business_name, business_type, location, description=""):
-    prompt = f"""
-    Generate 3 realistic job positions for this business:
-
-    Business Name: {business_name}
-    Business Type: {business_type}
-    Location: {location}
-    Description: {description}
-
-    For each position, provide:
-    1. Job Title
-    2. Key Responsibilities (3-4 points)
-    3. Required Qualifications (3-4 points)
-    4. Expected Salary Range (in Indian Rupees)
-
-    Format each job as:
-    Position: [Job Title]
-    Responsibilities:
-    - [Responsibility 1]
-    - [Responsibility 2]
-    - [Responsibility 3]
-    Qualifications:
-    - [Qualification 1]
-    - [Qualification 2]
-    - [Qualification 3]
-    Salary: [Salary Range]
-
-    Make the suggestions realistic and appropriate for the business type and location.
-    Keep the response concise and focused on essential information.
-    """
+    """Return the job postings for a business as a list of Posting dicts (empty on failure)."""
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        response = get_model().generate_content(
+            build_job_prompt(business_name, business_type, location, description),
+            generation_config=JOB_GENERATION_CONFIG
+        )
+        return parse_job_response(business_name, response.text)
     except Exception as e:
-        return f"Error generating job suggestions: {str(e)}"
-
-def extract_coordinates(page):
-    url = page.url
-    if '@' in url:
-        coords = url.split('@')[1].split(',')[0:2]
-        return f"{coords[0]}, {coords[1]}"
-    return ""
+        print(f"Error generating job suggestions for {business_name}: {str(e)}")
+        return []
 
-def extract_location_url(page):
+def scrape_listings(business_type, location, total, headless=False, verbose=True, on_record=None):
     """
-    Extract the current page URL which contains the business location on Google Maps
+    Search Google Maps and scrape up to `total` businesses, returning one dict
+    per business. `on_record` is called with each record as soon as it is ready.
+    A listing that fails is skipped so the rest of the search still completes.
     """
-    return page.url
+    full_search = f"{business_type} in {location}"
+    records = []
+
+    sync_playwright = subsystems.playwright.get()
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless)
+        page = browser.new_page()
 
-def extract_description(page):
-    description_xpath = '//div[@class="WeS02d fontBodyMedium"]//div[@class="PYvSYb "]'
-    if page.locator(description_xpath).count() > 0:
-        return page.locator(description_xpath).inner_text()
-    return ""
+        open_search(page, full_search)
+        listings, exhausted = scroll_feed(page, total)
+        if verbose:
+            if exhausted:
+                print("Arrived at all available")
+            print(f"Total Found: {len(listings)}")
+
+        # Scrape data from each listing
+        for i, listing in enumerate(listings):
+            try:
+                listing.click()
+                page.wait_for_timeout(2000)
+
+                name = page.locator(NAME_XPATH).inner_text() if page.locator(NAME_XPATH).count() > 0 else "Not found"
+                place = extract_place(page, name, business_type)
+
+                if verbose:
+                    print(f"\nGenerating job suggestions for {name}...")
+                record = {
+                    'Business Name': name,
+                    'Coordinates': place['coordinates'],
+                    'Phone Number': place['phone'],
+                    'Description': place['description'],
+                    'Job Suggestions': generate_job_suggestions(name, place['category'], place['coordinates'], place['description']),
+                    'Location URL': place['location_url']
+                }
+                records.append(record)
+                if on_record:
+                    on_record(record)
+
+                if verbose:
+                    print(f"✓ Scraped data for: {name}")
+                    print(f"  URL: {place['location_url']}")
+
+                # Go back to results
+                page.keyboard.press("Escape")
+                page.wait_for_timeout(1000)
+            except Exception as e:
+                print(f"✗ Error processing listing {i+1} of {full_search}: {str(e)}")
+                continue
+
+        browser.close()
+
+    return records
 
 def main():
     # Get user prompt
@@ -134,115 +125,139 @@ def main():
     print(f"Number of results: {total}")
     print("-----------------------------------\n")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
-
-        # Start at the search location
-        page.goto(f"https://www.google.com/maps/search/{full_search}", timeout=60000)
-        page.wait_for_timeout(2000)
-
-        # Wait for results to load
-        page.wait_for_selector('//a[contains(@href, "https://www.google.com/maps/place")]')
-
-        # Scroll to load more results
-        previously_counted = 0
-        while True:
-            page.mouse.wheel(0, 10000)
-            page.wait_for_timeout(2000)
-
-            current_count = page.locator('//a[contains(@href, "https://www.google.com/maps/place")]').count()
-
-            if current_count >= total:
-                listings = page.locator('//a[contains(@href, "https://www.google.com/maps/place")]').all()[:total]
-                print(f"Total Found: {len(listings)}")
-                break
-            elif current_count == previously_counted:
-                listings = page.locator('//a[contains(@href, "https://www.google.com/maps/place")]').all()
-                print(f"Arrived at all available\nTotal Found: {len(listings)}")
-                break
-            else:
-                previously_counted = current_count
-                print(f"Currently Found: {current_count}")
-
-        # Scrape data from each listing
-        for listing in listings:
-            listing.click()
-            page.wait_for_timeout(2000)
-
-            # Extract business name
-            name_xpath = '//div[@class="TIHn2 "]//h1[@class="DUwDvf lfPIob"]'
-            if page.locator(name_xpath).count() > 0:
-                name = page.locator(name_xpath).inner_text()
-            else:
-                name = "Not found"
+    records = scrape_listings(business_type, location, total)
 
-            # Extract coordinates
-            coords = extract_coordinates(page)
+    # Save businesses and their postings as two linked tables
+    paths = storage.save_results(records, basename='business_jobs_with_urls')
+    df, postings = storage.normalize(records)
+    print(f"\nData saved to {paths[0]} and {paths[1]}")
+    print("\nSample of collected data:")
+    print(df[['Business Name', 'Phone Number', 'Location URL']].head())
 
-            # Extract location URL
-            location_url = extract_location_url(page)
+    # Display summary
+    print(f"\n📊 Summary:")
+    print(f"Total businesses scraped: {len(df)}")
+    print(f"Businesses with phone numbers: {len(df[df['Phone Number'] != 'Not found'])}")
+    print(f"Businesses with descriptions: {len(df[df['Description'] != ''])}")
+    print(f"Job postings generated: {len(postings)}")
 
-            # Extract phone number
-            phone_xpath = '//button[contains(@data-item-id, "phone:tel:")]//div[contains(@class, "fontBodyMedium")]'
-            if page.locator(phone_xpath).count() > 0:
-                phone = page.locator(phone_xpath).inner_text()
+def read_batch_rows(path, default_total):
+    """
+    Read batch input. A .csv file needs `business_type` and `location` columns
+    (and optionally `total`); any other file is read as one prompt per line.
+    Each row gets a stable key so interrupted runs can be resumed.
+    """
+    rows = []
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                total = int(row.get('total') or default_total)
+                rows.append({
+                    'key': f"{i}:{row['business_type']}|{row['location']}|{total}",
+                    'business_type': row['business_type'],
+                    'location': row['location'],
+                    'total': max(1, min(50, total))
+                })
+    else:
+        with open(path, encoding='utf-8') as f:
+            for i, line in enumerate(f):
+                prompt = line.strip()
+                if prompt:
+                    rows.append({'key': f"{i}:{prompt}", 'prompt': prompt, 'total': max(1, min(50, default_total))})
+    return rows
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return {line.rstrip('\n') for line in f if line.strip()}
+
+def drop_partial_rows(path, completed):
+    """
+    Remove output lines of rows that never reached the checkpoint, so that
+    re-running them does not duplicate the businesses they already wrote.
+    """
+    if not os.path.exists(path):
+        return 0
+    kept, dropped = [], 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                row = json.loads(line)['row']
+            except (ValueError, KeyError, TypeError):
+                row = None  # Cut off mid-write
+            if row in completed:
+                kept.append(line)
             else:
-                phone = "Not found"
-
-            # Extract business type (fallback to Gemini-determined type if not found)
-            business_type_xpath = '//div[@class="LBgpqf"]//button[@class="DkEaL "]'
-            if page.locator(business_type_xpath).count() > 0:
-                scraped_business_type = page.locator(business_type_xpath).inner_text()
+                dropped += 1
+    if dropped:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(kept)
+        os.replace(tmp_path, path)
+    return dropped
+
+def run_batch(args):
+    rows = read_batch_rows(args.input, args.total)
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint"
+    completed = load_checkpoint(checkpoint_path)
+    dropped = drop_partial_rows(args.output, completed)
+    if dropped:
+        print(f"Dropped {dropped} records of unfinished rows from {args.output}")
+    pending = [row for row in rows if row['key'] not in completed]
+    print(f"{len(rows)} rows, {len(rows) - len(pending)} already done, {len(pending)} to run with concurrency {args.concurrency}")
+
+    write_lock = threading.Lock()
+    with open(args.output, 'a', encoding='utf-8') as out, open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+
+        def write_record(row, business_type, location, record):
+            line = json.dumps({'row': row['key'], 'business_type': business_type, 'location': location, **record}, ensure_ascii=False)
+            with write_lock:
+                out.write(line + '\n')
+                out.flush()
+
+        def process(row):
+            if 'prompt' in row:
+                business_type, location = analyze_prompt_for_job_fit(row['prompt'])
             else:
-                scraped_business_type = business_type
-
-            # Extract description
-            description = extract_description(page)
-
-            # Generate job suggestions
-            print(f"\nGenerating job suggestions for {name}...")
-            job_suggestions = generate_job_suggestions(name, scraped_business_type, coords, description)
-
-            # Store the data
-            names_list.append(name)
-            coordinates_list.append(coords)
-            phones_list.append(phone)
-            descriptions_list.append(description)
-            job_suggestions_list.append(job_suggestions)
-            location_urls_list.append(location_url)  # Store the location URL
-
-            print(f"✓ Scraped data for: {name}")
-            print(f"  URL: {location_url}")
-
-            # Go back to results
-            page.keyboard.press("Escape")
-            page.wait_for_timeout(1000)
-
-        # Create DataFrame and save to CSV
-        df = pd.DataFrame({
-            'Business Name': names_list,
-            'Coordinates': coordinates_list,
-            'Phone Number': phones_list,
-            'Description': descriptions_list,
-            'Job Suggestions': job_suggestions_list,
-            'Location URL': location_urls_list  # Add the new column
-        })
-
-        # Save to CSV
-        filename = 'business_jobs_with_urls.csv'
-        df.to_csv(filename, index=False)
-        print(f"\nData saved to {filename}")
-        print("\nSample of collected data:")
-        print(df[['Business Name', 'Phone Number', 'Location URL']].head())
-        
-        # Display summary
-        print(f"\n📊 Summary:")
-        print(f"Total businesses scraped: {len(df)}")
-        print(f"Businesses with phone numbers: {len(df[df['Phone Number'] != 'Not found'])}")
-        print(f"Businesses with descriptions: {len(df[df['Description'] != ''])}")
-
-        browser.close()
+                business_type, location = row['business_type'], row['location']
+            records = scrape_listings(
+                business_type, location, row['total'], headless=True, verbose=False,
+                on_record=lambda record: write_record(row, business_type, location, record)
+            )
+            # Only checkpoint once the whole row is on disk; a rerun drops and repeats partial rows
+            with write_lock:
+                checkpoint.write(row['key'] + '\n')
+                checkpoint.flush()
+            return len(records)
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            futures = {executor.submit(process, row): row for row in pending}
+            for future in as_completed(futures):
+                row = futures[future]
+                try:
+                    print(f"✓ {row['key']}: {future.result()} businesses")
+                except Exception as e:
+                    failed += 1
+                    print(f"✗ {row['key']}: {str(e)}")
+
+    print(f"\nBatch finished: {len(pending) - failed} rows done, {failed} failed. Results in {args.output}")
+    return 1 if failed else 0
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Business Job Scraper")
+    subparsers = parser.add_subparsers(dest='command')
+    batch = subparsers.add_parser('batch', help="Scrape many prompts or (business_type, location) rows unattended")
+    batch.add_argument('input', help="CSV with business_type,location[,total] columns, or a text file with one prompt per line")
+    batch.add_argument('-o', '--output', default='batch_results.jsonl', help="JSON Lines file results are appended to")
+    batch.add_argument('-c', '--concurrency', type=int, default=os.cpu_count() or 2, help="Browsers to run at once")
+    batch.add_argument('-t', '--total', type=int, default=10, help="Results per row when the input does not say")
+    batch.add_argument('--checkpoint', help="File of completed row keys (default: <output>.checkpoint)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args(sys.argv[1:])
+    if args.command == 'batch':
+        sys.exit(run_batch(args))
+    main()
@@ -0,0 +1,131 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+PLACE_LINK_XPATH = '//a[contains(@href, "https://www.google.com/maps/place")]'
+NAME_XPATH = '//div[@class="TIHn2 "]//h1[@class="DUwDvf lfPIob"]'
+PHONE_XPATH = '//button[contains(@data-item-id, "phone:tel:")]//div[contains(@class, "fontBodyMedium")]'
+BUSINESS_TYPE_XPATH = '//div[@class="LBgpqf"]//button[@class="DkEaL "]'
+DESCRIPTION_XPATH = '//div[@class="WeS02d fontBodyMedium"]//div[@class="PYvSYb "]'
+
+
+def coordinates_from_url(url):
+    if '@' in url:
+        coords = url.split('@')[1].split(',')[0:2]
+        return f"{coords[0]}, {coords[1]}"
+    return ""
+
+
+def extract_coordinates(page):
+    return coordinates_from_url(page.url)
+
+
+def extract_location_url(page):
+    return page.url
+
+
+def extract_description(page):
+    if page.locator(DESCRIPTION_XPATH).count() > 0:
+        return page.locator(DESCRIPTION_XPATH).inner_text()
+    return ""
+
+
+def place_fields(url, name, phone, category, description):
+    """The fields the HTTP engine returns for a place, from what the place panel shows."""
+    return {
+        'place_url': url,
+        'location_url': url,
+        'name': name,
+        'coordinates': coordinates_from_url(url),
+        'phone': phone,
+        'category': category,
+        'description': description
+    }
+
+
+def extract_place(page, name, fallback_category):
+    """Read the open place panel into the same fields the HTTP engine returns."""
+    return place_fields(
+        page.url, name,
+        page.locator(PHONE_XPATH).inner_text() if page.locator(PHONE_XPATH).count() > 0 else "Not found",
+        page.locator(BUSINESS_TYPE_XPATH).inner_text() if page.locator(BUSINESS_TYPE_XPATH).count() > 0 else fallback_category,
+        extract_description(page)
+    )
+
+
+def feed_done(current_count, previously_counted, total):
+    """After a scroll: (done, exhausted) for a feed that now lists `current_count` places."""
+    logger.info(f"Current results count: {current_count}")
+    if current_count >= total:
+        return True, False
+    # A feed that stopped growing has no more places
+    exhausted = current_count == previously_counted
+    return exhausted, exhausted
+
+
+def found_listings(listings, total, exhausted):
+    listings = listings if exhausted else listings[:total]
+    if exhausted:
+        logger.info(f"Reached all available results: {len(listings)}")
+    else:
+        logger.info(f"Total found: {len(listings)}")
+    return listings, exhausted
+
+
+def scroll_feed(page, total):
+    """Scroll the results feed until it lists `total` places or stops growing; returns (listings, exhausted)."""
+    previously_counted = 0
+    while True:
+        page.mouse.wheel(0, 10000)
+        page.wait_for_timeout(2000)
+        current_count = page.locator(PLACE_LINK_XPATH).count()
+        done, exhausted = feed_done(current_count, previously_counted, total)
+        if done:
+            return found_listings(page.locator(PLACE_LINK_XPATH).all(), total, exhausted)
+        previously_counted = current_count
+
+
+def open_search(page, full_search):
+    page.goto(f"https://www.google.com/maps/search/{full_search}", timeout=60000)
+    page.wait_for_timeout(3000)
+    logger.info("Navigated to Google Maps")
+    page.wait_for_selector(PLACE_LINK_XPATH, timeout=30000)
+    logger.info("Search results loaded")
+
+
+# Awaitable counterparts for Playwright's async API (see async_scraper.py)
+
+async def text_or_default(page, xpath, default):
+    locator = page.locator(xpath)
+    if await locator.count() > 0:
+        return await locator.first.inner_text()
+    return default
+
+
+async def extract_place_async(page, name, fallback_category):
+    return place_fields(
+        page.url, name,
+        await text_or_default(page, PHONE_XPATH, "Not found"),
+        await text_or_default(page, BUSINESS_TYPE_XPATH, fallback_category),
+        await text_or_default(page, DESCRIPTION_XPATH, "")
+    )
+
+
+async def scroll_feed_async(page, total):
+    previously_counted = 0
+    while True:
+        await page.mouse.wheel(0, 10000)
+        await page.wait_for_timeout(2000)
+        current_count = await page.locator(PLACE_LINK_XPATH).count()
+        done, exhausted = feed_done(current_count, previously_counted, total)
+        if done:
+            return found_listings(await page.locator(PLACE_LINK_XPATH).all(), total, exhausted)
+        previously_counted = current_count
+
+
+async def open_search_async(page, full_search):
+    await page.goto(f"https://www.google.com/maps/search/{full_search}", timeout=60000)
+    await page.wait_for_timeout(3000)
+    logger.info("Navigated to Google Maps")
+    await page.wait_for_selector(PLACE_LINK_XPATH, timeout=30000)
+    logger.info("Search results loaded")
@@ -0,0 +1,133 @@
+import json
+import logging
+from dataclasses import dataclass, asdict, field
+
+logger = logging.getLogger(__name__)
+
+
+def as_list(value):
+    """Gemini sometimes answers a list field with a single string; treat that as a one-item list."""
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+@dataclass
+class Posting:
+    jobTitle: str
+    keyResponsibilities: list = field(default_factory=list)
+    requiredSkills: list = field(default_factory=list)
+    expectedSalaryRange: str = ""
+    benefits: str = ""
+    experienceLevel: str = ""
+    workingHours: str = ""
+    growthOpportunities: str = ""
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict) or not data.get('jobTitle'):
+            raise ValueError(f"Not a job posting: {data!r}")
+        return cls(
+            jobTitle=str(data['jobTitle']),
+            keyResponsibilities=[str(item) for item in as_list(data.get('keyResponsibilities'))],
+            requiredSkills=[str(item) for item in as_list(data.get('requiredSkills'))],
+            expectedSalaryRange=str(data.get('expectedSalaryRange') or ""),
+            benefits=str(data.get('benefits') or ""),
+            experienceLevel=str(data.get('experienceLevel') or ""),
+            workingHours=str(data.get('workingHours') or ""),
+            growthOpportunities=str(data.get('growthOpportunities') or ""),
+        )
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def strip_code_fence(text):
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def _parse(text, build):
+    data = json.loads(strip_code_fence(text))
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        raise ValueError(f"Expected a JSON array of postings, got {type(data).__name__}")
+
+    postings = []
+    for item in data:
+        try:
+            postings.append(build(item))
+        except ValueError as e:
+            logger.warning(f"Dropping malformed posting: {str(e)}")
+    if not postings:
+        raise ValueError("No valid postings in response")
+    return postings
+
+
+def parse_postings(text):
+    """
+    Parse a model response into Posting records, skipping malformed entries.
+    Raises ValueError if the response holds no usable posting at all.
+    """
+    return _parse(text, Posting.from_dict)
+
+
+# Compact output schema: short keys and codes the model emits instead of prose,
+# expanded locally into the full Posting structure
+EXPERIENCE_LEVELS = {
+    'E': 'Entry Level',
+    'M': 'Mid Level',
+    'S': 'Senior Level',
+}
+
+BENEFIT_CODES = {
+    'PF': 'Provident Fund',
+    'ESI': 'ESI health insurance',
+    'INS': 'Health insurance',
+    'MEAL': 'Free meals',
+    'STAY': 'Accommodation provided',
+    'TRAVEL': 'Travel allowance',
+    'OT': 'Overtime pay',
+    'BONUS': 'Festival bonus',
+    'LEAVE': 'Paid leave',
+    'UNIFORM': 'Uniform provided',
+    'TRAIN': 'On-the-job training',
+    'INCENT': 'Performance incentives',
+}
+
+
+def format_salary(pay):
+    try:
+        low, high = (int(value) for value in pay)
+    except (TypeError, ValueError):
+        return str(pay or "")
+    return f"₹{low:,} - ₹{high:,} per month"
+
+
+def expand_compact(item):
+    """Turn one compact posting ({"t", "r", "s", "p", "x", "h", "b", "g"}) into a Posting."""
+    if not isinstance(item, dict) or not item.get('t'):
+        raise ValueError(f"Not a compact job posting: {item!r}")
+    benefits = [BENEFIT_CODES.get(str(code).upper(), str(code)) for code in as_list(item.get('b'))]
+    return Posting(
+        jobTitle=str(item['t']),
+        keyResponsibilities=[str(entry) for entry in as_list(item.get('r'))],
+        requiredSkills=[str(entry) for entry in as_list(item.get('s'))],
+        expectedSalaryRange=format_salary(item.get('p')),
+        benefits=", ".join(benefits),
+        experienceLevel=EXPERIENCE_LEVELS.get(str(item.get('x', '')).upper(), str(item.get('x') or "")),
+        workingHours=str(item.get('h') or ""),
+        growthOpportunities=str(item.get('g') or ""),
+    )
+
+
+def parse_compact_postings(text):
+    """Like parse_postings(), for responses in the compact schema."""
+    return _parse(text, expand_compact)
@@ -0,0 +1,224 @@
+import cProfile
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+# Older profiles, traces included, are deleted once either limit is passed
+PROFILE_MAX_COUNT = int(os.getenv('PROFILE_MAX_COUNT', '50'))
+PROFILE_MAX_AGE_HOURS = float(os.getenv('PROFILE_MAX_AGE_HOURS', '72'))
+PROFILE_HEADER = 'X-Profile'
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+CPU_PROFILE = 'cpu.prof'
+CPU_SUMMARY = 'cpu.txt'
+PLAYWRIGHT_TRACE = 'trace.zip'
+META = 'meta.json'
+
+_REQUEST_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# The profiled request (if any) the current thread is working for
+_active = threading.local()
+
+
+def is_admin(headers):
+    token = headers.get('X-Admin-Token')
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+
+def should_profile(headers):
+    """
+    Profile when an admin asks for it with `X-Profile: 1`, or for a random
+    PROFILE_SAMPLE_RATE fraction of requests. Costs one comparison when off.
+    """
+    if headers.get(PROFILE_HEADER) == '1' and is_admin(headers):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def valid_request_id(request_id):
+    return bool(request_id and _REQUEST_ID_RE.match(request_id))
+
+
+class _Session:
+    """Profiles of the worker threads that did part of one profiled request."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.profilers = []
+        self.closed = False
+
+    def add(self, profiler):
+        with self.lock:
+            if not self.closed:
+                self.profilers.append(profiler)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            return list(self.profilers)
+
+
+def _enable(profiler):
+    try:
+        profiler.enable()
+        return True
+    except ValueError as e:
+        # Python 3.12+ allows only one active profiler per process
+        logger.warning(f"Could not start profiler in {threading.current_thread().name}: {str(e)}")
+        return False
+
+
+def propagate(fn):
+    """
+    Wrap `fn`, about to be handed to another thread, so that if the calling
+    thread is serving a profiled request the worker thread is profiled into
+    the same request. Returns `fn` unchanged otherwise.
+    """
+    session = getattr(_active, 'session', None)
+    if session is None:
+        return fn
+
+    def run(*args, **kwargs):
+        previous = getattr(_active, 'session', None)
+        _active.session = session
+        profiler = cProfile.Profile()
+        enabled = _enable(profiler)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if enabled:
+                profiler.disable()
+                session.add(profiler)
+            _active.session = previous
+    return run
+
+
+def category_trace_path(trace_path, index):
+    """Trace file for the index-th category of a fanned-out scrape: trace.zip, trace-1.zip, ..."""
+    if not trace_path or index == 0:
+        return trace_path
+    base, ext = os.path.splitext(trace_path)
+    return f"{base}-{index}{ext}"
+
+
+def prune_profiles(max_count=None, max_age_hours=None):
+    """
+    Delete profile directories beyond the newest `max_count` or older than
+    `max_age_hours`. Directories still being written (no meta yet) are only
+    removed once they are past the age limit.
+    """
+    max_count = PROFILE_MAX_COUNT if max_count is None else max_count
+    max_age_hours = PROFILE_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+    if not os.path.isdir(PROFILE_DIR):
+        return 0
+    cutoff = time.time() - max_age_hours * 3600
+    finished = []
+    expired = []
+    for request_id in os.listdir(PROFILE_DIR):
+        directory = os.path.join(PROFILE_DIR, request_id)
+        if not os.path.isdir(directory):
+            continue
+        try:
+            modified = os.path.getmtime(directory)
+        except OSError:
+            continue
+        if modified < cutoff:
+            expired.append(directory)
+        elif os.path.exists(os.path.join(directory, META)):
+            finished.append((modified, directory))
+    finished.sort(reverse=True)
+    expired.extend(directory for _, directory in finished[max_count:])
+    for directory in expired:
+        shutil.rmtree(directory, ignore_errors=True)
+    if expired:
+        logger.info(f"Pruned {len(expired)} old profiles from {PROFILE_DIR}")
+    return len(expired)
+
+
+@contextmanager
+def profile_request(request_id, label='', client_request_id=None):
+    """
+    Capture a cProfile of the calling thread, merged with the profiles of
+    any work it hands to other threads through propagate(), into
+    PROFILE_DIR/<request_id>/. Work still running when the request
+    finishes is left out. Yields the path the caller should write its
+    Playwright trace to. `request_id` must be generated by the server;
+    an id the client sent is only recorded as `client_request_id`.
+    """
+    directory = os.path.join(PROFILE_DIR, request_id)
+    os.makedirs(directory, exist_ok=True)
+    profiler = cProfile.Profile()
+    session = _Session()
+    started = time.time()
+    logger.info(f"Profiling request {request_id}")
+    previous = getattr(_active, 'session', None)
+    _active.session = session
+    enabled = _enable(profiler)
+    try:
+        yield os.path.join(directory, PLAYWRIGHT_TRACE)
+    finally:
+        if enabled:
+            profiler.disable()
+        _active.session = previous
+        workers = session.close()
+        stats = pstats.Stats(profiler) if enabled else None
+        for worker in workers:
+            if stats is None:
+                stats = pstats.Stats(worker)
+            else:
+                stats.add(worker)
+        if stats is not None:
+            stats.dump_stats(os.path.join(directory, CPU_PROFILE))
+            summary = io.StringIO()
+            stats.stream = summary
+            stats.sort_stats('cumulative').print_stats(40)
+            with open(os.path.join(directory, CPU_SUMMARY), 'w', encoding='utf-8') as f:
+                f.write(summary.getvalue())
+        with open(os.path.join(directory, META), 'w', encoding='utf-8') as f:
+            json.dump({
+                'request_id': request_id,
+                'client_request_id': client_request_id,
+                'label': label,
+                'started_at': started,
+                'duration_ms': round((time.time() - started) * 1000, 1),
+                'threads': len(workers) + (1 if enabled else 0),
+            }, f)
+        logger.info(f"Saved profile for request {request_id} to {directory}")
+        prune_profiles()
+
+
+def profiled(scrape, request_id, label='', client_request_id=None):
+    """Wrap a scrape function so it runs under profile_request and records a Playwright trace."""
+    def run(*args, **kwargs):
+        with profile_request(request_id, label, client_request_id) as trace_path:
+            return scrape(*args, trace_path=trace_path, **kwargs)
+    return run
+
+
+def list_profiles():
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for request_id in os.listdir(PROFILE_DIR):
+        directory = os.path.join(PROFILE_DIR, request_id)
+        meta_path = os.path.join(directory, META)
+        if not os.path.exists(meta_path):
+            continue
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        meta['files'] = sorted(name for name in os.listdir(directory) if name != META)
+        profiles.append(meta)
+    return sorted(profiles, key=lambda meta: meta['started_at'], reverse=True)
@@ -0,0 +1,234 @@
+import csv
+import os
+import re
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'indian_cities.csv')
+
+# Skill or job keyword -> Google Maps business types to search for, most relevant first
+SKILL_TO_BUSINESS_TYPES = {
+    'cook': ['restaurant', 'hotel', 'catering service', 'cloud kitchen'],
+    'chef': ['restaurant', 'hotel', 'catering service', 'cloud kitchen'],
+    'cooking': ['restaurant', 'hotel', 'catering service', 'cloud kitchen'],
+    'kitchen helper': ['restaurant', 'hotel', 'catering service'],
+    'waiter': ['restaurant', 'hotel', 'cafe', 'banquet hall'],
+    'waitress': ['restaurant', 'hotel', 'cafe', 'banquet hall'],
+    'dishwasher': ['restaurant', 'hotel', 'catering service'],
+    'baker': ['bakery', 'sweet shop', 'hotel'],
+    'tandoor': ['restaurant', 'dhaba', 'catering service'],
+    'electrician': ['electrical contractor', 'construction company', 'electrical repair shop'],
+    'wireman': ['electrical contractor', 'construction company'],
+    'plumber': ['plumbing service', 'construction company', 'hardware store'],
+    'plumbing': ['plumbing service', 'construction company', 'hardware store'],
+    'carpenter': ['carpentry workshop', 'furniture store', 'interior designer'],
+    'carpentry': ['carpentry workshop', 'furniture store', 'interior designer'],
+    'painter': ['painting contractor', 'construction company', 'interior designer'],
+    'mason': ['construction company', 'building contractor'],
+    'construction worker': ['construction company', 'building contractor'],
+    'labourer': ['construction company', 'warehouse', 'factory'],
+    'laborer': ['construction company', 'warehouse', 'factory'],
+    'welder': ['fabrication workshop', 'steel fabricator', 'factory'],
+    'welding': ['fabrication workshop', 'steel fabricator', 'factory'],
+    'fitter': ['fabrication workshop', 'factory', 'plumbing service'],
+    'mechanic': ['car repair shop', 'motorcycle repair shop', 'car dealer'],
+    'car mechanic': ['car repair shop', 'car dealer', 'car service center'],
+    'bike mechanic': ['motorcycle repair shop', 'motorcycle dealer'],
+    'two wheeler mechanic': ['motorcycle repair shop', 'motorcycle dealer'],
+    'ac technician': ['air conditioning repair service', 'electronics repair shop', 'appliance store'],
+    'ac mechanic': ['air conditioning repair service', 'electronics repair shop', 'appliance store'],
+    'driver': ['transport company', 'taxi service', 'logistics company', 'travel agency'],
+    'cab driver': ['taxi service', 'travel agency', 'transport company'],
+    'truck driver': ['logistics company', 'transport company', 'packers and movers'],
+    'delivery': ['courier service', 'logistics company', 'restaurant', 'grocery store'],
+    'delivery boy': ['courier service', 'logistics company', 'restaurant', 'grocery store'],
+    'delivery driver': ['courier service', 'logistics company', 'restaurant', 'grocery store'],
+    'courier': ['courier service', 'logistics company'],
+    'security guard': ['security services company', 'apartment complex', 'shopping mall'],
+    'security': ['security services company', 'apartment complex', 'shopping mall'],
+    'watchman': ['security services company', 'apartment complex', 'warehouse'],
+    'housekeeping': ['hotel', 'hospital', 'cleaning service'],
+    'housekeeper': ['hotel', 'hospital', 'cleaning service'],
+    'room boy': ['hotel', 'guest house', 'lodge'],
+    'receptionist': ['hotel', 'hospital', 'clinic'],
+    'cleaner': ['cleaning service', 'hotel', 'hospital', 'office'],
+    'sweeper': ['cleaning service', 'hospital', 'office'],
+    'maid': ['domestic help agency', 'cleaning service'],
+    'nanny': ['domestic help agency', 'daycare'],
+    'babysitter': ['domestic help agency', 'daycare'],
+    'tailor': ['tailor shop', 'boutique', 'garment factory'],
+    'stitching': ['tailor shop', 'boutique', 'garment factory'],
+    'beautician': ['beauty salon', 'spa', 'bridal makeup studio'],
+    'hairdresser': ['beauty salon', 'barber shop', 'spa'],
+    'barber': ['barber shop', 'beauty salon'],
+    'salesman': ['retail store', 'showroom', 'supermarket'],
+    'salesperson': ['retail store', 'showroom', 'supermarket'],
+    'shop assistant': ['retail store', 'supermarket', 'clothing store'],
+    'cashier': ['supermarket', 'retail store', 'restaurant', 'petrol pump'],
+    'store helper': ['supermarket', 'grocery store', 'retail store'],
+    'warehouse': ['warehouse', 'logistics company', 'e-commerce fulfilment centre'],
+    'loader': ['warehouse', 'logistics company', 'transport company'],
+    'packer': ['warehouse', 'packers and movers', 'factory'],
+    'picker': ['warehouse', 'e-commerce fulfilment centre'],
+    'nurse': ['hospital', 'clinic', 'nursing home'],
+    'ward boy': ['hospital', 'nursing home', 'clinic'],
+    'pharmacist': ['pharmacy', 'hospital'],
+    'teacher': ['school', 'coaching centre', 'college'],
+    'tutor': ['coaching centre', 'school'],
+    'gardener': ['landscaping service', 'plant nursery', 'apartment complex'],
+    'mali': ['landscaping service', 'plant nursery', 'apartment complex'],
+    'farm worker': ['farm', 'dairy farm', 'poultry farm'],
+    'machine operator': ['manufacturing company', 'factory', 'printing press'],
+    'factory worker': ['factory', 'manufacturing company', 'garment factory'],
+    'helper': ['local business'],
+    'data entry': ['office', 'bpo', 'accounting firm'],
+    'office boy': ['office', 'bank', 'accounting firm'],
+    'peon': ['office', 'school', 'bank'],
+    'accountant': ['accounting firm', 'chartered accountant', 'office'],
+    'software developer': ['tech company', 'software company', 'it services company'],
+    'developer': ['tech company', 'software company', 'it services company'],
+    'programmer': ['tech company', 'software company', 'it services company'],
+}
+
+# Business types a user may name directly ("restaurant in Mumbai")
+BUSINESS_TYPE_KEYWORDS = sorted({types[0] for types in SKILL_TO_BUSINESS_TYPES.values()} | {
+    'hotel', 'hospital', 'restaurant', 'bakery', 'school', 'factory', 'supermarket',
+    'tech company', 'retail store', 'salon', 'garage', 'cafe', 'dhaba', 'clinic',
+})
+
+# Not 'from': "a cook from Patna" names where the user is, not where they want work
+LOCATION_PREPOSITIONS = {'in', 'at', 'near', 'around'}
+
+PromptAnalysis = namedtuple('PromptAnalysis', ['business_type', 'location', 'confidence', 'business_types'])
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+class PhraseTrie:
+    """
+    Word-level trie that finds the longest phrase match starting at each token.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, phrase, value):
+        node = self.root
+        for token in _tokenize(phrase):
+            node = node.setdefault(token, {})
+        if node is not self.root:
+            node.setdefault(None, value)
+
+    def find_all(self, tokens):
+        matches = []
+        i = 0
+        while i < len(tokens):
+            node = self.root
+            best = None
+            j = i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if None in node:
+                    best = (i, j, node[None])
+            if best:
+                matches.append(best)
+                i = best[1]
+            else:
+                i += 1
+        return matches
+
+
+def _load_cities(path):
+    cities = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            aliases = [a for a in row['aliases'].split('|') if a]
+            cities[row['name']] = {
+                'name': row['name'],
+                'state': row['state'],
+                'lat': float(row['lat']),
+                'lng': float(row['lng']),
+                'aliases': aliases,
+            }
+    return cities
+
+
+def _compile():
+    cities = _load_cities(GAZETTEER_PATH)
+    city_trie = PhraseTrie()
+    for city in cities.values():
+        for phrase in [city['name']] + city['aliases']:
+            city_trie.add(phrase, city['name'])
+
+    skill_trie = PhraseTrie()
+    for skill, business_types in SKILL_TO_BUSINESS_TYPES.items():
+        skill_trie.add(skill, tuple(business_types))
+        if not skill.endswith('s'):
+            skill_trie.add(skill + 's', tuple(business_types))
+    for business_type in BUSINESS_TYPE_KEYWORDS:
+        # Naming a business type outright means exactly that type
+        skill_trie.add(business_type, (business_type,))
+        skill_trie.add(business_type + 's', (business_type,))
+
+    logger.info(f"Compiled gazetteer with {len(cities)} cities")
+    return cities, city_trie, skill_trie
+
+
+CITIES, _CITY_TRIE, _SKILL_TRIE = _compile()
+
+
+def lookup_city(name):
+    """Gazetteer entry for the city `name` starts with, so "Hyderabad, Telangana" finds Hyderabad."""
+    tokens = _tokenize(name or '')
+    leading = [(end, city) for start, end, city in _CITY_TRIE.find_all(tokens) if start == 0]
+    if not leading:
+        return None
+    return CITIES[max(leading)[1]]
+
+
+def parse_prompt(prompt):
+    """
+    Extract business type and location from a prompt without calling Gemini.
+    Confidence is 1.0 only when both a known skill/business type and a known
+    city were found; callers should fall back to Gemini below their threshold.
+    """
+    tokens = _tokenize(prompt)
+
+    location = None
+    location_score = 0.0
+    city_matches = _CITY_TRIE.find_all(tokens)
+    for start, end, city in city_matches:
+        # A bare city may be a person's name ("I am Sagar") or where someone is
+        # from, so on its own it never clears the Gemini threshold; among equals
+        # the last one wins ("from Patna ... work in Mumbai")
+        score = 0.5 if start > 0 and tokens[start - 1] in LOCATION_PREPOSITIONS else 0.25
+        if score >= location_score:
+            location, location_score = city, score
+    if len({m[2] for m in city_matches}) > 1:
+        # "Chennai or Madurai": keep the guess but leave the choice to Gemini
+        location_score = 0.2
+
+    business_types = []
+    business_score = 0.0
+    skill_matches = _SKILL_TRIE.find_all(tokens)
+    if skill_matches:
+        # Prefer the longest phrase ("bike mechanic" over "mechanic"), then the earliest
+        start, end, best = max(skill_matches, key=lambda m: (m[1] - m[0], -m[0]))
+        business_types = list(best)
+        # Other matched skills contribute their categories after the best match's
+        for match in skill_matches:
+            business_types.extend(t for t in match[2] if t not in business_types)
+        business_score = 0.5 if business_types[0] != 'local business' else 0.2
+        if len({m[2][0] for m in skill_matches}) > 1:
+            business_score -= 0.1
+
+    confidence = round(location_score + business_score, 2)
+    business_type = business_types[0] if business_types else None
+    return PromptAnalysis(business_type, location, confidence, business_types)
@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+
+from dotenv import load_dotenv
+
+import subsystems
+from postings import BENEFIT_CODES, parse_compact_postings, parse_postings
+
+logger = logging.getLogger(__name__)
+
+# Settings below may come from .env; load it here so every importer sees them
+load_dotenv()
+
+LOCAL_PARSER_MIN_CONFIDENCE = float(os.getenv('LOCAL_PARSER_MIN_CONFIDENCE', '0.8'))
+MAX_CATEGORIES = int(os.getenv('MAX_CATEGORIES', '2'))
+
+
+# Gemini is initialized on first use (see subsystems.py)
+def get_model():
+    return subsystems.gemini.get()
+
+
+ANALYSIS_GENERATION_CONFIG = {
+    "temperature": 0.5,
+    "max_output_tokens": 512
+}
+
+
+def build_analysis_prompt(prompt):
+    return f"""
+    Analyze the following user prompt to determine the most suitable types of business and location for job opportunities based on their skills, interests, or preferences:
+
+    Prompt: "{prompt}"
+
+    Provide the response in the following JSON format:
+    {{
+        "businessTypes": ["[most relevant, e.g., restaurant]", "[next, e.g., hotel]", "[next, e.g., catering service]"],
+        "location": "[e.g., New York, Bangalore]",
+        "reasoning": "[Brief explanation of why these choices were made]"
+    }}
+
+    List up to {MAX_CATEGORIES} business types, most relevant first, each a distinct kind of business someone could search for on Google Maps.
+    If the prompt is vague, use ["Local Business"] for business types and "Nearby" for location.
+    """
+
+
+def parse_analysis_categories(response_text):
+    response_text = response_text.strip()
+    if response_text.startswith("```json"):
+        response_text = response_text[7:-3].strip()
+    try:
+        data = json.loads(response_text)
+        business_types = data.get("businessTypes") or [data.get("businessType")]
+        if isinstance(business_types, str):
+            business_types = [business_types]
+        business_types = [t.strip() for t in business_types if isinstance(t, str) and t.strip()]
+        location = data.get("location", "Nearby")
+        if not business_types or not location:
+            logger.warning(f"Empty business type or location in Gemini response: {response_text}")
+            return ["Local Business"], "Nearby"
+        logger.info(f"Prompt analyzed: Business Types={business_types}, Location={location}")
+        return business_types, location
+    except json.JSONDecodeError:
+        logger.warning(f"Failed to parse Gemini response as JSON: {response_text}")
+        return ["Local Business"], "Nearby"
+
+
+def parse_analysis_response(response_text):
+    business_types, location = parse_analysis_categories(response_text)
+    return business_types[0], location
+
+
+VERBOSE_JOB_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "max_output_tokens": 2048
+}
+
+
+COMPACT_JOB_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "max_output_tokens": 1024
+}
+
+
+def build_compact_job_prompt(business_name, business_type, location, description=""):
+    return f"""Job postings for: {business_name} | {business_type} | {location}
+About: {description or '-'}
+Return a JSON array of 3 realistic roles at different levels, using exactly these keys:
+t=job title; r=3-4 duties; s=3-4 skills; p=[min,max] monthly INR for this city; x=E|M|S (entry/mid/senior); h=hours, e.g. "9am-6pm, 6 days"; b=benefit codes from {','.join(BENEFIT_CODES)}; g=growth path in at most 6 words.
+Keep duties and skills under 8 words each. JSON only."""
+
+
+def build_verbose_job_prompt(business_name, business_type, location, description=""):
+    return f"""
+    Generate 3 realistic and detailed job positions tailored to the following business based on its type, location, and description:
+
+    Business Name: {business_name}
+    Business Type: {business_type}
+    Location: {location}
+    Description: {description}
+
+    For each position, provide comprehensive details including:
+    1. Job Title (specific and relevant to the business)
+    2. Key Responsibilities (4-5 detailed points)
+    3. Required Qualifications/Skills (4-5 specific points)
+    4. Expected Salary Range (realistic Indian Rupees based on location and role)
+    5. Benefits and Perks
+    6. Experience Level Required
+    7. Working Hours/Schedule
+    8. Growth Opportunities
+
+    Return the response as a JSON array with exactly this structure:
+    [
+        {{
+            "jobTitle": "Specific Job Title Here",
+            "keyResponsibilities": [
+                "Detailed responsibility 1",
+                "Detailed responsibility 2", 
+                "Detailed responsibility 3",
+                "Detailed responsibility 4"
+            ],
+            "requiredSkills": [
+                "Specific skill/qualification 1",
+                "Specific skill/qualification 2",
+                "Specific skill/qualification 3", 
+                "Specific skill/qualification 4"
+            ],
+            "expectedSalaryRange": "₹XX,XXX - ₹XX,XXX per month",
+            "benefits": "Comprehensive benefits including health insurance, paid time off, bonuses, etc.",
+            "experienceLevel": "Entry Level / Mid Level / Senior Level",
+            "workingHours": "Working schedule and hours",
+            "growthOpportunities": "Career advancement and learning opportunities available"
+        }}
+    ]
+
+    Guidelines:
+    - Make job titles specific to the business type and realistic for the given location
+    - Include both technical and soft skills relevant to the industry
+    - Salary should reflect the Indian market, adjusting for location (e.g., higher for metros, lower for tier-2 cities)
+    - Ensure responsibilities are actionable and specific to the business
+    - Vary the positions across different levels or departments
+    - Ensure the response is valid JSON and tailored to the provided business details
+    """
+
+
+# name -> (prompt builder, generation config, response parser)
+JOB_PROMPT_STYLES = {
+    'compact': (build_compact_job_prompt, COMPACT_JOB_GENERATION_CONFIG, parse_compact_postings),
+    'verbose': (build_verbose_job_prompt, VERBOSE_JOB_GENERATION_CONFIG, parse_postings),
+}
+JOB_PROMPT_STYLE = os.getenv('JOB_PROMPT_STYLE', 'compact')
+build_job_prompt, JOB_GENERATION_CONFIG, _parse_job_postings = JOB_PROMPT_STYLES[JOB_PROMPT_STYLE]
+
+
+def generation_usage(prompt, response):
+    """Token counts for one call; estimated at ~4 characters per token if the SDK does not report them."""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None and getattr(usage, 'prompt_token_count', None):
+        return usage.prompt_token_count, usage.candidates_token_count
+    return len(prompt) // 4, len(response.text) // 4
+
+
+def parse_job_response(business_name, response_text, parser=None):
+    response_text = response_text.strip()
+    logger.info(f"Raw job suggestion for {business_name}: {response_text[:200]}...")
+    try:
+        postings = (parser or _parse_job_postings)(response_text)
+        logger.debug(f"Generated {len(postings)} job suggestions for {business_name}")
+        return [posting.to_dict() for posting in postings]
+    except ValueError as e:
+        logger.error(f"Failed to parse job suggestions for {business_name}: {str(e)}")
+        return []
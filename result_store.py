@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import math
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.getenv('JOB_GENIE_DB', 'job_genie.db')
+RESULT_TTL_SECONDS = float(os.getenv('RESULT_CACHE_TTL_HOURS', '24')) * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_log (
+    query_key TEXT NOT NULL,
+    business_type TEXT NOT NULL,
+    location TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    requested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_query_log_time ON query_log (requested_at);
+CREATE TABLE IF NOT EXISTS results (
+    query_key TEXT PRIMARY KEY,
+    business_type TEXT NOT NULL,
+    location TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS result_sets (
+    result_id TEXT PRIMARY KEY,
+    business_type TEXT NOT NULL,
+    location TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 1,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS query_sessions (
+    session_id TEXT PRIMARY KEY,
+    business_type TEXT NOT NULL,
+    location TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+_migrated = False
+
+
+def _migrate(conn):
+    global _migrated
+    if _migrated:
+        return
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(result_sets)")}
+    if 'complete' not in columns:
+        conn.execute("ALTER TABLE result_sets ADD COLUMN complete INTEGER NOT NULL DEFAULT 1")
+    if 'error' not in columns:
+        conn.execute("ALTER TABLE result_sets ADD COLUMN error TEXT")
+    _migrated = True
+
+
+@contextmanager
+def connect(path=None):
+    conn = sqlite3.connect(path or DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def query_key(business_type, location):
+    return f"{' '.join(business_type.lower().split())}|{' '.join(location.lower().split())}"
+
+
+def log_query(business_type, location, total):
+    with connect() as conn:
+        conn.execute(
+            "INSERT INTO query_log (query_key, business_type, location, total, requested_at) VALUES (?, ?, ?, ?, ?)",
+            (query_key(business_type, location), business_type, location, total, time.time()),
+        )
+
+
+def save_results(business_type, location, total, results):
+    with connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO results (query_key, business_type, location, total, payload, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (query_key(business_type, location), business_type, location, total, json.dumps(results), time.time()),
+        )
+    logger.info(f"Stored {len(results)} results for {business_type} in {location}")
+
+
+def get_results(business_type, location, total, max_age=None):
+    """
+    Return stored results for the query if they are fresh and cover `total`
+    businesses (or every business the search had), else None.
+    """
+    max_age = RESULT_TTL_SECONDS if max_age is None else max_age
+    with connect() as conn:
+        row = conn.execute(
+            "SELECT total, payload, updated_at FROM results WHERE query_key = ?",
+            (query_key(business_type, location),),
+        ).fetchone()
+    if row is None or time.time() - row['updated_at'] > max_age:
+        return None
+    results = json.loads(row['payload'])
+    if len(results) < total and row['total'] < total:
+        return None
+    return results[:total]
+
+
+def popular_queries(window_hours=72, half_life_hours=24, limit=20):
+    """
+    Rank recently requested queries by exponentially decayed demand.
+    Each row is (business_type, location, total, score), where total is the
+    largest result count requested for that query in the window.
+    """
+    now = time.time()
+    with connect() as conn:
+        rows = conn.execute(
+            "SELECT query_key, business_type, location, total, requested_at FROM query_log WHERE requested_at >= ?",
+            (now - window_hours * 3600,),
+        ).fetchall()
+
+    ranked = {}
+    for row in rows:
+        age_hours = (now - row['requested_at']) / 3600
+        weight = math.pow(0.5, age_hours / half_life_hours)
+        entry = ranked.setdefault(row['query_key'], [row['business_type'], row['location'], 0, 0.0])
+        entry[2] = max(entry[2], row['total'])
+        entry[3] += weight
+
+    return sorted((tuple(e) for e in ranked.values()), key=lambda e: e[3], reverse=True)[:limit]
+
+
+def save_result_set(business_type, location, results):
+    """
+    Store a snapshot of `results` that clients can page through later. The
+    id is derived from the content, so serving the same results twice reuses
+    one snapshot.
+    """
+    payload = json.dumps(results)
+    result_id = hashlib.sha1(f"{query_key(business_type, location)}\n{payload}".encode('utf-8')).hexdigest()[:16]
+    with connect() as conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO result_sets (result_id, business_type, location, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (result_id, business_type, location, payload, time.time()),
+        )
+    return result_id
+
+
+def put_result_set(result_id, business_type, location, results, complete, error=None):
+    """Create or overwrite a result set that is still being filled in; `error` says why it stopped early."""
+    with connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO result_sets (result_id, business_type, location, payload, updated_at, complete, error) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (result_id, business_type, location, json.dumps(results), time.time(), int(complete), error),
+        )
+
+
+def get_result_set(result_id):
+    with connect() as conn:
+        row = conn.execute(
+            "SELECT business_type, location, payload, complete, error FROM result_sets WHERE result_id = ?",
+            (result_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    return {
+        'business_type': row['business_type'],
+        'location': row['location'],
+        'results': json.loads(row['payload']),
+        'complete': bool(row['complete']),
+        'error': row['error']
+    }
+
+
+def session_id(business_type, location):
+    return hashlib.sha1(query_key(business_type, location).encode('utf-8')).hexdigest()[:16]
+
+
+def save_session(session):
+    with connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO query_sessions (session_id, business_type, location, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (session['session_id'], session['business_type'], session['location'], json.dumps(session), time.time()),
+        )
+
+
+def get_session(session_id, max_age=None):
+    """Return a stored query session unless it is older than the result TTL."""
+    max_age = RESULT_TTL_SECONDS if max_age is None else max_age
+    with connect() as conn:
+        row = conn.execute(
+            "SELECT payload, updated_at FROM query_sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+    if row is None or time.time() - row['updated_at'] > max_age:
+        return None
+    return json.loads(row['payload'])
@@ -0,0 +1,416 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+
+import admission
+import extraction
+import profiling
+import result_store
+import storage
+import subsystems
+from maps_page import NAME_XPATH, extract_place, open_search, scroll_feed
+from prompts import JOB_GENERATION_CONFIG, JOB_PROMPT_STYLE, build_job_prompt, generation_usage, get_model, parse_job_response
+from speculation import SpeculationClosed
+
+logger = logging.getLogger(__name__)
+
+
+def generate_job_suggestions(business_name, business_type, location, description=""):
+    try:
+        prompt = build_job_prompt(business_name, business_type, location, description)
+        start = time.perf_counter()
+        response = get_model().generate_content(prompt, generation_config=JOB_GENERATION_CONFIG)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        tokens_in, tokens_out = generation_usage(prompt, response)
+        logger.info(f"Job suggestions for {business_name}: {tokens_in} tokens in, {tokens_out} tokens out, {elapsed_ms:.0f}ms ({JOB_PROMPT_STYLE})")
+        return parse_job_response(business_name, response.text)
+    except Exception as e:
+        logger.error(f"Error generating job suggestion for {business_name}: {str(e)}")
+        return []
+
+
+ENRICHMENT_WORKERS = int(os.getenv('ENRICHMENT_WORKERS', '4'))
+enrichment_pool = ThreadPoolExecutor(max_workers=ENRICHMENT_WORKERS, thread_name_prefix='enrich')
+
+
+class Usage:
+    """Browsers launched and places enriched on behalf of one caller, counted across threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.browsers = 0
+        self.enrichments = 0
+
+    def add(self, browsers=0, enrichments=0):
+        with self.lock:
+            self.browsers += browsers
+            self.enrichments += enrichments
+
+
+PENDING_POSTINGS = 'pending'
+READY_POSTINGS = 'ready'
+
+
+def record_from_place(place):
+    return {
+        'Business Name': place['name'],
+        'Coordinates': place['coordinates'],
+        'Phone Number': place['phone'],
+        'Description': place['description'],
+        'Job Suggestions': [],
+        'Location URL': place['location_url'],
+        'Postings Status': PENDING_POSTINGS
+    }
+
+
+def new_session(business_type, location):
+    return {
+        'session_id': result_store.session_id(business_type, location),
+        'business_type': business_type,
+        'location': location,
+        'place_urls': [],
+        'records': {},
+        'exhausted': False
+    }
+
+
+def scrape_jobs(business_type, location, total=5, on_update=None, trace_path=None, session=None, persist=True,
+                page=None, searched=None, usage=None):
+    """
+    Scrape up to `total` businesses. Job suggestions are generated on
+    enrichment_pool while the browser moves on to the next listing; records
+    carry 'Postings Status' pending/ready until then. `on_update` is called
+    with a snapshot of the records whenever one is added or enriched.
+    A Playwright trace is recorded to `trace_path` when given.
+
+    `session` remembers the ordered place list and the records already
+    scraped for this query, so asking for a larger `total` later only
+    searches and enriches the places that are new.
+
+    `page` is an already open browser page to scrape with instead of
+    launching one; `searched` is the search it already shows, if any.
+    `usage`, if given, counts the browsers launched and places enriched.
+    """
+    session = (session
+               or result_store.get_session(result_store.session_id(business_type, location))
+               or new_session(business_type, location))
+    place_urls = session['place_urls']
+    known_records = session['records']
+    records = []
+    records_lock = threading.Lock()
+    enrichments = []
+    seen_names = set()
+
+    def notify():
+        if on_update:
+            # Called under the lock so consumers see snapshots in order
+            with records_lock:
+                on_update([dict(record) for record in records])
+
+    def enrich(record, scraped_business_type):
+        name = record['Business Name']
+        logger.info(f"Generating comprehensive job suggestions for {name}")
+        job_suggestions = generate_job_suggestions(name, scraped_business_type, record['Coordinates'], record['Description'])
+        logger.debug(f"Job suggestions for {name}: {job_suggestions}")  # Debug log to verify output
+        with records_lock:
+            record['Job Suggestions'] = job_suggestions
+            record['Postings Status'] = READY_POSTINGS
+        notify()
+
+    def reuse(place_url):
+        record = dict(known_records[place_url])
+        with records_lock:
+            records.append(record)
+        seen_names.add(record['Business Name'])
+        notify()
+
+    full_search = f"{business_type} in {location}"
+    need_search = len(place_urls) < total and not session['exhausted']
+    if not need_search and all(url in known_records for url in place_urls[:total]):
+        logger.info(f"All {min(total, len(place_urls))} places for {full_search} already scraped in this session")
+        for place_url in place_urls[:total]:
+            reuse(place_url)
+        return records, business_type, location
+
+    logger.info(f"Starting scrape for: {full_search}, Total={total}, already scraped={len(known_records)}")
+
+    def add_record(place_url, place):
+        if place['name'] in seen_names:
+            logger.info(f"Skipping duplicate business: {place['name']}")
+            return
+        seen_names.add(place['name'])
+        record = record_from_place(place)
+        with records_lock:
+            records.append(record)
+        known_records[place_url] = record
+        notify()
+        enrichments.append(enrichment_pool.submit(profiling.propagate(enrich), record, place['category']))
+        if usage is not None:
+            usage.add(enrichments=1)
+        logger.info(f"✓ Scraped comprehensive data for: {place['name']}")
+
+    def scrape_http(extractor):
+        # Fetch everything before touching the session or records, so a
+        # failure part-way leaves the browser fallback a clean slate
+        found_urls = list(place_urls)
+        fetched = {}
+        if need_search:
+            places, exhausted = extractor.search(full_search, business_type)
+            for place in places:
+                fetched[place['place_url']] = place
+                if place['place_url'] not in found_urls:
+                    found_urls.append(place['place_url'])
+            # A short first page ends this search, but only scrolling the feed
+            # proves it is exhausted, so a continuation goes to the browser
+            if len(found_urls) < total and (not exhausted or place_urls):
+                raise extraction.ExtractionError(f"Only {len(places)} results are available without scrolling the feed")
+        for place_url in found_urls[:total]:
+            if place_url not in known_records and place_url not in fetched:
+                fetched[place_url] = extractor.place(place_url, business_type)
+
+        place_urls.extend(found_urls[len(place_urls):])
+        for place_url in place_urls[:total]:
+            if place_url in known_records:
+                reuse(place_url)
+            else:
+                add_record(place_url, fetched[place_url])
+            if len(records) >= total:
+                break
+
+    def scrape_page(page):
+        if trace_path:
+            page.context.tracing.start(screenshots=True, snapshots=True)
+
+        listings_by_url = {}
+        if need_search:
+            if (searched or '').lower() != full_search.lower():
+                open_search(page, full_search)
+
+            listings, exhausted = scroll_feed(page, total)
+            if exhausted:
+                session['exhausted'] = True
+
+            for listing in listings:
+                place_url = listing.get_attribute('href')
+                listings_by_url[place_url] = listing
+                if place_url not in place_urls:
+                    place_urls.append(place_url)
+
+        targets = place_urls[:total]
+        for i, place_url in enumerate(targets):
+            if place_url in known_records:
+                reuse(place_url)
+                continue
+            try:
+                logger.info(f"Processing listing {i+1}/{len(targets)}")
+                if place_url in listings_by_url:
+                    listings_by_url[place_url].click()
+                else:
+                    # Known from an earlier search in this session; open it directly
+                    page.goto(place_url, timeout=60000)
+                page.wait_for_timeout(3000)
+
+                name = page.locator(NAME_XPATH).inner_text() if page.locator(NAME_XPATH).count() > 0 else "Not found"
+                if name in seen_names:
+                    logger.info(f"Skipping duplicate business: {name}")
+                    continue
+
+                add_record(place_url, extract_place(page, name, business_type))
+                page.keyboard.press("Escape")
+                page.wait_for_timeout(1000)
+
+                if len(records) >= total:
+                    break
+            except Exception as e:
+                logger.error(f"Error processing listing {i+1}: {str(e)}")
+                continue
+
+        if trace_path:
+            page.context.tracing.stop(path=trace_path)
+
+    scraped_over_http = False
+    extractor = extraction.get_extractor()
+    if extractor is not None:
+        try:
+            scrape_http(extractor)
+            scraped_over_http = True
+            logger.info(f"Scraped {len(records)} places for {full_search} without a browser")
+        except extraction.ExtractionError as e:
+            logger.warning(f"{extractor.name} extraction failed for {full_search}, falling back to the browser: {str(e)}")
+
+    if not scraped_over_http:
+        try:
+            if page is not None:
+                # Browser already launched, and maybe searched, by a SpeculativeSearch
+                scrape_page(page)
+            else:
+                sync_playwright = subsystems.playwright.get()
+                with sync_playwright() as p:
+                    browser = p.chromium.launch(headless=True)
+                    if usage is not None:
+                        usage.add(browsers=1)
+                    scrape_page(browser.new_context().new_page())
+                    browser.close()
+                    logger.info("Browser closed")
+        except Exception as e:
+            logger.error(f"Scraping failed: {str(e)}")
+            raise
+
+    wait_futures(enrichments)
+    result_store.save_session(session)
+    if persist:
+        storage.save_results(records)
+
+    return records, business_type, location
+
+
+def place_key(record):
+    return f"{record['Business Name'].strip().lower()}|{record['Coordinates']}"
+
+
+def merge_ranked(result_lists, total):
+    """
+    Interleave per-category results round-robin in category rank order,
+    dropping businesses already listed under a higher-ranked category.
+    """
+    merged = []
+    seen = set()
+    for round_records in itertools.zip_longest(*result_lists):
+        for record in round_records:
+            if record is None or place_key(record) in seen:
+                continue
+            seen.add(place_key(record))
+            merged.append(record)
+    return merged[:total]
+
+
+def split_total(total, count):
+    """Each of `count` ranked categories' share of `total`, best-ranked first."""
+    return [total // count + (1 if index < total % count else 0) for index in range(count)]
+
+
+def scrape_categories(business_types, location, total=5, on_update=None, trace_path=None, fresh=False, speculation=None,
+                      browsers=None, usage=None):
+    """
+    Search several business types concurrently, one browser each, and merge
+    them into one ranked, de-duplicated list. The categories split `total`
+    between them, so no more places are scraped and enriched than one scrape
+    of `total` would, except to replace places listed under several categories.
+    `fresh` ignores stored query sessions and re-scrapes every place.
+    A SpeculativeSearch, if given, runs the category it guessed (or else the
+    top one) on its already open browser, or lends that category its
+    admission slot if the browser has already closed.
+    `browsers`, if given, is a semaphore each category holds while its
+    browser is open, so callers with a fixed browser budget can share it.
+    `usage`, if given, counts the browsers launched and places enriched.
+    """
+    sessions = {}
+
+    def session_for(business_type):
+        if not fresh:
+            return None
+        return sessions.setdefault(business_type, new_session(business_type, location))
+
+    def scrape(*args, **kwargs):
+        if browsers is None:
+            return scrape_jobs(*args, usage=usage, **kwargs)
+        with browsers:
+            return scrape_jobs(*args, usage=usage, **kwargs)
+
+    speculative_index = None
+    if speculation is not None:
+        # Only the first `total` categories get a share of it
+        speculative_index = next((i for i, business_type in enumerate(business_types[:total])
+                                  if speculation.matches(business_type, location)), 0)
+
+    def speculate(index, business_type, share, **kwargs):
+        if index != speculative_index:
+            return None
+        return speculation.run(profiling.propagate(scrape_jobs), business_type, location, share,
+                               session=session_for(business_type), usage=usage, **kwargs)
+
+    def fallback(index):
+        if index != speculative_index:
+            return scrape
+        # The speculative browser closed without scraping; its slot carries over to this category
+        return admission.admitted(scrape, speculation.take_slot())
+
+    def result_of(index, future, business_type, share, **kwargs):
+        try:
+            return future.result()
+        except SpeculationClosed as e:
+            logger.info(f"{str(e)}, scraping {business_type} with a new browser")
+            return fallback(index)(business_type, location, share, session=session_for(business_type), **kwargs)
+
+    if len(business_types) == 1:
+        future = speculate(0, business_types[0], total, on_update=on_update, trace_path=trace_path)
+        if future is not None:
+            return result_of(0, future, business_types[0], total, on_update=on_update, trace_path=trace_path)
+        return fallback(0)(business_types[0], location, total, on_update=on_update, trace_path=trace_path,
+                           session=session_for(business_types[0]))
+
+    # Split total between the categories, best-ranked first, so merge_ranked
+    # takes every place found unless some are listed under several categories
+    quotas = split_total(total, len(business_types))
+    snapshots = [[] for _ in business_types]
+    snapshots_lock = threading.Lock()
+
+    def category_update(index):
+        def update(records):
+            with snapshots_lock:
+                snapshots[index] = records
+                if on_update:
+                    on_update(merge_ranked(snapshots, total))
+        return update
+
+    def category_kwargs(index, traced=True):
+        return {
+            'on_update': category_update(index),
+            'trace_path': profiling.category_trace_path(trace_path, index) if traced else None,
+            'persist': False
+        }
+
+    logger.info(f"Fanning out {location} search over {business_types}, {quotas} results each")
+    result_lists = [[] for _ in business_types]
+    with ThreadPoolExecutor(max_workers=len(business_types), thread_name_prefix='category') as executor:
+        futures = {}
+        for index, business_type in enumerate(business_types):
+            if not quotas[index]:
+                continue
+            futures[index] = (speculate(index, business_type, quotas[index], **category_kwargs(index))
+                              or executor.submit(profiling.propagate(fallback(index)), business_type, location,
+                                                 quotas[index], session=session_for(business_type),
+                                                 **category_kwargs(index)))
+        for index, future in futures.items():
+            business_type = business_types[index]
+            try:
+                result_lists[index] = result_of(index, future, business_type, quotas[index], **category_kwargs(index))[0]
+            except Exception as e:
+                logger.error(f"Category {business_type} failed: {str(e)}")
+
+    if not any(result_lists):
+        raise RuntimeError(f"All category searches failed for {location}")
+    records = merge_ranked(result_lists, total)
+
+    # Places listed under several categories leave the merged list short: ask
+    # the best-ranked categories that may have more places for the difference
+    for index, business_type in enumerate(business_types):
+        if len(records) >= total:
+            break
+        if len(result_lists[index]) < quotas[index]:
+            continue
+        quotas[index] += total - len(records)
+        logger.info(f"Topping up {business_type} in {location} to {quotas[index]} places to replace duplicates")
+        try:
+            result_lists[index] = scrape(business_type, location, quotas[index], session=session_for(business_type),
+                                         **category_kwargs(index, traced=False))[0]
+        except Exception as e:
+            logger.error(f"Topping up {business_type} failed: {str(e)}")
+            continue
+        records = merge_ranked(result_lists, total)
+
+    storage.save_results(records)
+    return records, ', '.join(business_types), location
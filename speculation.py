@@ -0,0 +1,145 @@
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+import subsystems
+
+logger = logging.getLogger(__name__)
+
+SPECULATIVE_SEARCH = os.getenv('SPECULATIVE_SEARCH', '1') == '1'
+# How long a speculative browser waits for prompt analysis before giving up
+DECISION_TIMEOUT_SECONDS = float(os.getenv('SPECULATION_TIMEOUT_SECONDS', '60'))
+
+
+class SpeculationClosed(RuntimeError):
+    """The speculative browser closed before it could take the scrape handed to it."""
+
+
+class SpeculativeSearch:
+    """
+    Launches a browser and opens the Maps search for a locally guessed query
+    (or leaves it blank when there is no full guess) while the prompt is
+    still being analyzed. Once the analysis is known the
+    caller either hands the scrape to this browser with run(), which reuses
+    the search page if the guess matched and navigates it to the right query
+    if not, or cancel()s it. Playwright's sync API is bound to the thread
+    that started it, so the scrape itself runs on this object's thread.
+
+    The admission slot is released once the browser has scraped or been
+    cancelled. If the browser closes without either, the slot is kept for
+    the caller to scrape with instead (take_slot()).
+    """
+
+    def __init__(self, open_search, business_type, location, slot=None):
+        self.open_search = open_search
+        self.business_type = business_type
+        self.location = location
+        # Without both guesses the browser is only launched, and waits on a blank page
+        self.search = f"{business_type} in {location}" if business_type and location else None
+        self.label = self.search or f"blank browser ({location or 'no location'})"
+        self.slot = slot
+        self.decision = queue.Queue(maxsize=1)
+        self.decided = False
+        self.closed = False
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name=f"speculate-{business_type or 'blank'}", daemon=True)
+
+    def start(self):
+        logger.info(f"Speculative search for {self.label} started while the prompt is analyzed")
+        self.thread.start()
+        return self
+
+    def matches(self, business_type, location):
+        if self.search is None:
+            return False
+        return (business_type.strip().lower() == self.business_type.strip().lower()
+                and location.strip().lower() == self.location.strip().lower())
+
+    def run(self, scrape, business_type, location, total, **kwargs):
+        """
+        Run scrape(business_type, location, total, page=..., searched=..., **kwargs)
+        on the speculative browser. Returns a Future, or None if the browser
+        has already gone away and the caller should scrape on its own with
+        take_slot(). The Future raises SpeculationClosed if the browser went
+        away while the scrape was being handed over.
+        """
+        future = Future()
+        with self.lock:
+            if self.closed or self.decided:
+                return None
+            self.decided = True
+            self.decision.put((scrape, business_type, location, total, kwargs, future))
+        return future
+
+    def take_slot(self):
+        """The admission slot of a browser that closed without scraping, for the caller to use."""
+        with self.lock:
+            if not self.closed:
+                return None
+            slot, self.slot = self.slot, None
+        return slot
+
+    def cancel(self):
+        with self.lock:
+            if not self.decided and not self.closed:
+                self.decided = True
+                self.decision.put(None)
+                return
+        slot = self.take_slot()
+        if slot:
+            slot.release()
+
+    def _run(self):
+        try:
+            sync_playwright = subsystems.playwright.get()
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=True)
+                page = browser.new_context().new_page()
+                searched = None
+                if self.search:
+                    try:
+                        self.open_search(page, self.search)
+                        searched = self.search
+                    except Exception as e:
+                        logger.warning(f"Speculative search for {self.search} failed: {str(e)}")
+
+                try:
+                    decision = self.decision.get(timeout=DECISION_TIMEOUT_SECONDS)
+                except queue.Empty:
+                    logger.warning(f"No decision for speculative search {self.label}, closing browser")
+                    decision = None
+                if decision is None:
+                    logger.info(f"Speculative search for {self.label} cancelled")
+                    browser.close()
+                    return
+
+                scrape, business_type, location, total, kwargs, future = decision
+                if self.matches(business_type, location):
+                    logger.info(f"Speculative search for {self.label} kept")
+                else:
+                    logger.info(f"Speculative search for {self.label} redirected to {business_type} in {location}")
+                try:
+                    future.set_result(scrape(business_type, location, total, page=page, searched=searched, **kwargs))
+                except Exception as e:
+                    future.set_exception(e)
+                browser.close()
+        except Exception as e:
+            logger.error(f"Speculative browser failed: {str(e)}")
+        finally:
+            with self.lock:
+                self.closed = True
+                try:
+                    leftover = self.decision.get_nowait()
+                except queue.Empty:
+                    leftover = None
+                # Scraped or cancelled: nobody else will scrape with this slot
+                slot = self.slot if self.decided and leftover is None else None
+                if slot:
+                    self.slot = None
+            # A scrape handed over just before the browser failed still needs an answer
+            if leftover is not None and not leftover[-1].done():
+                leftover[-1].set_exception(SpeculationClosed(f"Speculative browser for {self.label} closed"))
+            if slot:
+                slot.release()
@@ -1,67 +1,413 @@
-document.getElementById('submitButton').addEventListener('click', async () => {
-    const prompt = document.getElementById('promptInput').value.trim();
-    const total = document.getElementById('totalInput').value;
-    
+const chatContainer = document.getElementById('chatContainer');
+const userInput = document.getElementById('userInput');
+const totalInput = document.getElementById('totalInput');
+const sendButton = document.getElementById('sendButton');
+const omnidimButton = document.getElementById('omnidimButton');
+
+// Ask /scrape for whatever is ready after this long; the rest is polled from /results
+const DEADLINE_MS = 4000;
+// Polling backs off while nothing new arrives, and gives up after POLL_MAX_ATTEMPTS requests
+const POLL_INTERVAL_MS = 2000;
+const POLL_MAX_INTERVAL_MS = 15000;
+const POLL_MAX_ATTEMPTS = 40;
+const POLL_PAGE_SIZE = 50;
+const CACHE_TTL_MS = 10 * 60 * 1000;
+// Cards are only kept in the DOM while within this distance of the visible area
+const RENDER_MARGIN_PX = 800;
+const ESTIMATED_CARD_HEIGHT_PX = 360;
+
+// Completed result sets by prompt and total, in memory and in sessionStorage across reloads
+const resultCache = {
+    memory: new Map(),
+
+    key(prompt, total) {
+        return `results:${prompt.toLowerCase()}|${total}`;
+    },
+
+    get(prompt, total) {
+        const key = this.key(prompt, total);
+        let entry = this.memory.get(key);
+        if (!entry) {
+            try {
+                entry = JSON.parse(sessionStorage.getItem(key));
+            } catch (e) {
+                entry = null;
+            }
+        }
+        if (!entry || Date.now() - entry.savedAt > CACHE_TTL_MS) {
+            this.memory.delete(key);
+            sessionStorage.removeItem(key);
+            return null;
+        }
+        this.memory.set(key, entry);
+        return entry.data;
+    },
+
+    put(prompt, total, data) {
+        const key = this.key(prompt, total);
+        const entry = { data, savedAt: Date.now() };
+        this.memory.set(key, entry);
+        try {
+            sessionStorage.setItem(key, JSON.stringify(entry));
+        } catch (e) {
+            // Storage full; the in-memory copy still serves this page
+        }
+    }
+};
+
+function sleep(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+function pollDelay(idlePolls) {
+    return Math.min(POLL_INTERVAL_MS * 1.5 ** idlePolls, POLL_MAX_INTERVAL_MS);
+}
+
+function el(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+}
+
+function infoLine(label, value) {
+    const line = el('div', 'job-info');
+    line.append(el('strong', '', label), ' ', value);
+    return line;
+}
+
+function fillExample(text) {
+    userInput.value = text;
+    userInput.focus();
+}
+
+function addMessage(message, isUser = false, isError = false) {
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `message ${isUser ? 'user-message' : 'assistant-message'} ${isError ? 'error-message' : ''}`;
+
+    if (typeof message === 'string') {
+        messageDiv.textContent = message;
+    } else {
+        messageDiv.appendChild(message);
+    }
+
+    chatContainer.appendChild(messageDiv);
+    chatContainer.scrollTop = chatContainer.scrollHeight;
+}
+
+function addLoadingIndicator() {
+    const loadingDiv = el('div', 'message assistant-message loading');
+    loadingDiv.append(el('span', '', 'Finding job opportunities for you...'), el('div', 'dot'), el('div', 'dot'), el('div', 'dot'));
+    chatContainer.appendChild(loadingDiv);
+    chatContainer.scrollTop = chatContainer.scrollHeight;
+    return loadingDiv;
+}
+
+function jobsOf(result) {
+    let jobs = result['Job Suggestions'] || [];
+    if (typeof jobs === 'string') {
+        // Results stored before postings became structured records
+        try {
+            jobs = JSON.parse(jobs);
+        } catch (e) {
+            console.error(`Error parsing job suggestion for ${result['Business Name']}: ${e.message}`);
+            jobs = [];
+        }
+    }
+    return jobs.filter(job => !job.error);
+}
+
+function renderList(title, items) {
+    const fragment = document.createDocumentFragment();
+    fragment.appendChild(el('h4', '', title));
+    const list = el('ul');
+    (items && items.length ? items : ['Not available']).forEach(item => list.appendChild(el('li', '', item)));
+    fragment.appendChild(list);
+    return fragment;
+}
+
+function renderPosting(job) {
+    const posting = el('div', 'job-details');
+    posting.appendChild(el('h4', 'job-title', job.jobTitle || 'Not available'));
+    posting.appendChild(renderList('🎯 Key Responsibilities:', job.keyResponsibilities));
+    posting.appendChild(renderList('🛠️ Required Skills:', job.requiredSkills));
+    posting.appendChild(infoLine('💰 Salary Range:', job.expectedSalaryRange || 'Not available'));
+    if (job.experienceLevel) posting.appendChild(infoLine('📈 Experience:', job.experienceLevel));
+    if (job.workingHours) posting.appendChild(infoLine('🕒 Hours:', job.workingHours));
+    posting.appendChild(infoLine('🎁 Benefits:', job.benefits || 'Not available'));
+    return posting;
+}
+
+function renderCard(result) {
+    const card = el('div', 'job-card');
+    card.appendChild(el('h3', 'job-title', result['Business Name']));
+
+    const details = el('div', 'job-details');
+    const mapLink = el('a', '', 'View on Google Maps');
+    mapLink.href = result['Location URL'];
+    mapLink.target = '_blank';
+    mapLink.rel = 'noopener';
+    details.appendChild(infoLine('📍 Location:', mapLink));
+    details.appendChild(infoLine('📞 Phone:', result['Phone Number'] || 'Not found'));
+    details.appendChild(infoLine('ℹ️ Description:', result['Description'] || 'Not available'));
+    details.appendChild(el('h4', '', '💼 Job Suggestions:'));
+
+    const jobs = jobsOf(result);
+    if (result['Postings Status'] === 'pending') {
+        details.appendChild(el('p', 'postings-pending', '⏳ Generating job suggestions...'));
+    } else if (jobs.length > 0) {
+        jobs.forEach(job => details.appendChild(renderPosting(job)));
+    } else {
+        details.appendChild(el('p', '', 'No job suggestions available'));
+    }
+    card.appendChild(details);
+    return card;
+}
+
+class ResultList {
+    /**
+     * Windowed list of business cards: every result gets a slot, but only
+     * slots near the visible part of the chat hold a rendered card. The
+     * others are emptied and keep their last measured height, so scrolling
+     * stays stable while the DOM stays small.
+     */
+    constructor() {
+        this.records = [];
+        this.slots = [];
+        this.element = el('div', 'job-suggestions');
+        this.observer = new IntersectionObserver(entries => this.onVisibility(entries), {
+            root: chatContainer,
+            rootMargin: `${RENDER_MARGIN_PX}px 0px`
+        });
+    }
+
+    update(records) {
+        records.forEach((record, index) => {
+            const previous = this.records[index];
+            this.records[index] = record;
+            if (index >= this.slots.length) {
+                const slot = el('div', 'job-slot');
+                slot.dataset.index = index;
+                slot.style.minHeight = `${ESTIMATED_CARD_HEIGHT_PX}px`;
+                this.slots.push(slot);
+                this.element.appendChild(slot);
+                this.observer.observe(slot);
+            } else if (this.slots[index].firstChild && changed(previous, record)) {
+                this.render(index);
+            }
+        });
+    }
+
+    render(index) {
+        const slot = this.slots[index];
+        slot.replaceChildren(renderCard(this.records[index]));
+        slot.style.minHeight = '';
+    }
+
+    onVisibility(entries) {
+        entries.forEach(entry => {
+            const slot = entry.target;
+            const index = Number(slot.dataset.index);
+            if (entry.isIntersecting && !slot.firstChild) {
+                this.render(index);
+            } else if (!entry.isIntersecting && slot.firstChild) {
+                slot.style.minHeight = `${entry.boundingClientRect.height}px`;
+                slot.replaceChildren();
+            }
+        });
+    }
+}
+
+function identity(record) {
+    return record['Location URL'] || record['Business Name'];
+}
+
+function changed(previous, record) {
+    // Merged multi-category results can move a different business into this slot
+    return identity(previous) !== identity(record)
+        || previous['Postings Status'] !== record['Postings Status']
+        || jobsOf(previous).length !== jobsOf(record).length;
+}
+
+class ResultView {
+    constructor(data) {
+        this.list = new ResultList();
+        this.count = el('p');
+        this.container = el('div');
+        this.container.appendChild(el('h3', '', `💼 Job Opportunities in ${data.business_type} - ${data.location}`));
+        this.container.appendChild(this.count);
+        this.container.appendChild(this.list.element);
+        this.container.appendChild(el('br'));
+        this.container.appendChild(el('em', '', '💡 Tip: Try different business types or locations for more options!'));
+        addMessage(this.container);
+    }
+
+    update(results, complete) {
+        this.count.textContent = `Found ${results.length} businesses${complete ? ':' : ' so far, still searching...'}`;
+        this.list.update(results);
+    }
+
+    showError(results, error) {
+        this.count.textContent = `Found ${results.length} businesses before the search stopped (${error}):`;
+    }
+
+    stopWaiting(results) {
+        this.count.textContent = `Found ${results.length} businesses. The search is taking longer than expected; ask again later for the rest.`;
+    }
+}
+
+async function getJson(url) {
+    const response = await fetch(url);
+    return response.json();
+}
+
+async function waitForTask(taskId) {
+    // Queued and tiled searches run on the workers; their results arrive through /tasks
+    for (let attempt = 0; attempt < POLL_MAX_ATTEMPTS; attempt++) {
+        await sleep(pollDelay(attempt));
+        const task = await getJson(`/tasks/${taskId}`);
+        if (task.status === 'done') return task;
+        if (task.status === 'failed' || task.error) return { error: task.error || 'Search failed' };
+    }
+    return { error: 'The search is taking longer than expected, please try again later' };
+}
+
+async function loadAll(data, view) {
+    // Render the first page at once, then the remaining pages as they arrive
+    let results = data.results;
+    let complete = data.complete !== false;
+    // Set when the scrape failed part-way; the results are what it found before that
+    let scrapeError = data.scrape_error;
+    view.update(results, complete && !data.next_cursor);
+    let cursor = data.next_cursor;
+    while (cursor) {
+        const page = await getJson(`/results/${data.result_id}?cursor=${encodeURIComponent(cursor)}`);
+        if (page.error) break;
+        results = results.concat(page.results);
+        cursor = page.next_cursor;
+        view.update(results, complete && !cursor);
+    }
+
+    // A search cut off by its deadline keeps filling the same result set in the background
+    let idlePolls = 0;
+    for (let attempt = 0; !complete && attempt < POLL_MAX_ATTEMPTS; attempt++) {
+        await sleep(pollDelay(idlePolls));
+        const before = JSON.stringify(results);
+        const page = await getJson(`/results/${data.result_id}?page_size=${POLL_PAGE_SIZE}`);
+        if (page.error) break;
+        results = page.results;
+        cursor = page.next_cursor;
+        while (cursor) {
+            const next = await getJson(`/results/${data.result_id}?cursor=${encodeURIComponent(cursor)}&page_size=${POLL_PAGE_SIZE}`);
+            if (next.error) break;
+            results = results.concat(next.results);
+            cursor = next.next_cursor;
+        }
+        complete = page.complete !== false;
+        scrapeError = page.scrape_error;
+        // New places and finished postings both count as progress
+        idlePolls = JSON.stringify(results) !== before ? 0 : idlePolls + 1;
+        view.update(results, complete);
+    }
+    if (scrapeError) {
+        view.showError(results, scrapeError);
+    } else if (!complete) {
+        view.stopWaiting(results);
+    }
+    return { ...data, results, next_cursor: null, complete, scrape_error: scrapeError };
+}
+
+async function handleUserInput() {
+    const prompt = userInput.value.trim();
+    let total = parseInt(totalInput.value);
+
     if (!prompt) {
-        alert('Please enter a prompt.');
+        addMessage('Please enter a prompt.', false, true);
         return;
     }
+    if (isNaN(total) || total < 1 || total > 50) {
+        addMessage('Please enter a valid number of results (1-50).', false, true);
+        return;
+    }
+
+    addMessage(prompt, true);
+    userInput.value = '';
+    totalInput.value = '5';
 
-    // Add user message to chat
-    const chatBox = document.getElementById('chatBox');
-    const userMessage = document.createElement('div');
-    userMessage.className = 'message user';
-    userMessage.textContent = prompt;
-    chatBox.appendChild(userMessage);
+    const cached = resultCache.get(prompt, total);
+    if (cached) {
+        new ResultView(cached).update(cached.results, true);
+        return;
+    }
 
-    // Clear inputs
-    document.getElementById('promptInput').value = '';
-    document.getElementById('totalInput').value = '10';
+    sendButton.disabled = true;
+    userInput.disabled = true;
+    totalInput.disabled = true;
+    const loadingIndicator = addLoadingIndicator();
 
-    // Send request to backend
     try {
         const response = await fetch('/scrape', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ prompt, total })
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ prompt, total, deadline_ms: DEADLINE_MS })
         });
 
-        const data = await response.json();
+        let data = await response.json();
+        if (response.status === 429) {
+            const retryAfter = response.headers.get('Retry-After');
+            data = { error: `${data.error || 'The server is busy'}. Please try again${retryAfter ? ` in ${retryAfter} seconds` : ' later'}.` };
+        } else if (data.task_id && !data.error) {
+            data = await waitForTask(data.task_id);
+        }
+        chatContainer.removeChild(loadingIndicator);
 
         if (data.error) {
-            const errorMessage = document.createElement('div');
-            errorMessage.className = 'message bot';
-            errorMessage.textContent = `Error: ${data.error}`;
-            chatBox.appendChild(errorMessage);
-        } else {
-            // Display analysis
-            const analysisMessage = document.createElement('div');
-            analysisMessage.className = 'message bot';
-            analysisMessage.textContent = `Based on your prompt, I recommend looking for jobs at ${data.business_type} in ${data.location}.`;
-            chatBox.appendChild(analysisMessage);
-
-            // Display results
-            data.results.forEach(result => {
-                const resultMessage = document.createElement('div');
-                resultMessage.className = 'message result';
-                resultMessage.innerHTML = `
-                    <strong>${result['Business Name']}</strong><br>
-                    <strong>Coordinates:</strong> ${result['Coordinates'] || 'Not found'}<br>
-                    <strong>Phone:</strong> ${result['Phone Number'] || 'Not found'}<br>
-                    <strong>Description:</strong> ${result['Description'] || 'Not available'}<br>
-                    <strong>Job Suggestions:</strong><br><pre>${result['Job Suggestions']}</pre>
-                `;
-                chatBox.appendChild(resultMessage);
-            });
+            addMessage(`Sorry, I encountered an error: ${data.error}`, false, true);
+            return;
         }
 
-        // Scroll to bottom
-        chatBox.scrollTop = chatBox.scrollHeight;
+        // The first results are on screen; let the user type while the rest loads
+        sendButton.disabled = false;
+        userInput.disabled = false;
+        totalInput.disabled = false;
+        userInput.focus();
+
+        const loaded = await loadAll(data, new ResultView(data));
+        if (loaded.complete && !loaded.scrape_error) {
+            resultCache.put(prompt, total, loaded);
+        }
     } catch (error) {
-        const errorMessage = document.createElement('div');
-        errorMessage.className = 'message bot';
-        errorMessage.textContent = 'An error occurred. Please try again.';
-        chatBox.appendChild(errorMessage);
-        chatBox.scrollTop = chatBox.scrollHeight;
+        console.error('Request error:', error);
+        if (loadingIndicator.parentNode) {
+            chatContainer.removeChild(loadingIndicator);
+        }
+        addMessage('Sorry, there was a network error. Please check your connection and try again.', false, true);
+    } finally {
+        sendButton.disabled = false;
+        userInput.disabled = false;
+        totalInput.disabled = false;
     }
-});
\ No newline at end of file
+}
+
+// Function to trigger Omnidimension widget (adjust based on documentation)
+function triggerOmnidimWidget() {
+    if (window.Omnidim && typeof window.Omnidim.open === 'function') {
+        window.Omnidim.open(); // Example method; replace with actual API call
+        addMessage('Omnidim widget opened.', false);
+    } else {
+        addMessage('Omnidim widget is not available or not initialized.', false, true);
+        console.error('Omnidim widget API not found.');
+    }
+}
+
+sendButton.addEventListener('click', handleUserInput);
+userInput.addEventListener('keypress', (e) => {
+    if (e.key === 'Enter' && !sendButton.disabled) {
+        handleUserInput();
+    }
+});
+omnidimButton.addEventListener('click', triggerOmnidimWidget);
+
+userInput.focus();
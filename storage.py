@@ -0,0 +1,61 @@
+import logging
+
+import subsystems
+
+logger = logging.getLogger(__name__)
+
+BUSINESS_COLUMNS = ['Business Name', 'Coordinates', 'Phone Number', 'Description', 'Location URL']
+POSTING_COLUMNS = [
+    'jobTitle', 'keyResponsibilities', 'requiredSkills', 'expectedSalaryRange',
+    'benefits', 'experienceLevel', 'workingHours', 'growthOpportunities',
+]
+
+
+def normalize(records):
+    """
+    Split scrape records into a businesses table and a postings table linked
+    by `business_id`, so postings are stored as columns rather than as a JSON
+    string inside a CSV cell.
+    """
+    pd = subsystems.pandas.get()
+    businesses = []
+    postings = []
+    for business_id, record in enumerate(records):
+        businesses.append({'business_id': business_id, **{c: record.get(c, "") for c in BUSINESS_COLUMNS}})
+        for index, posting in enumerate(record.get('Job Suggestions') or []):
+            postings.append({
+                'business_id': business_id,
+                'posting_index': index,
+                **{c: posting.get(c, [] if c in ('keyResponsibilities', 'requiredSkills') else "") for c in POSTING_COLUMNS}
+            })
+    return (
+        pd.DataFrame(businesses, columns=['business_id'] + BUSINESS_COLUMNS),
+        pd.DataFrame(postings, columns=['business_id', 'posting_index'] + POSTING_COLUMNS),
+    )
+
+
+def save_results(records, basename='business_jobs'):
+    """
+    Write `<basename>.parquet` and `<basename>_postings.parquet`. Without
+    pyarrow, fall back to `<basename>_businesses.csv` and
+    `<basename>_postings.csv` with list columns joined by " | ". The
+    businesses file is suffixed so it never replaces the tracked
+    business_jobs.csv, which has a different schema.
+    Returns the paths written.
+    """
+    businesses, postings = normalize(records)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning("pyarrow not installed, saving results as CSV")
+        for column in ('keyResponsibilities', 'requiredSkills'):
+            postings[column] = postings[column].map(lambda items: " | ".join(items))
+        paths = (f"{basename}_businesses.csv", f"{basename}_postings.csv")
+        businesses.to_csv(paths[0], index=False)
+        postings.to_csv(paths[1], index=False)
+    else:
+        paths = (f"{basename}.parquet", f"{basename}_postings.parquet")
+        businesses.to_parquet(paths[0], index=False)
+        postings.to_parquet(paths[1], index=False)
+    logger.info(f"Data saved to {paths[0]} and {paths[1]}")
+    return paths
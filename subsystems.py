@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+COLD = 'cold'
+READY = 'ready'
+ERROR = 'error'
+
+
+class LazySubsystem:
+    """
+    A heavy dependency that is only imported/configured the first time it is
+    needed. Failures are remembered for /healthz and retried on the next get().
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.value = None
+        self.state = COLD
+        self.error = None
+        self.load_ms = None
+
+    def get(self):
+        if self.state == READY:
+            return self.value
+        with self.lock:
+            if self.state != READY:
+                start = time.perf_counter()
+                try:
+                    self.value = self.loader()
+                except Exception as e:
+                    self.state, self.error = ERROR, str(e)
+                    logger.error(f"Failed to initialize {self.name}: {str(e)}")
+                    raise
+                self.load_ms = round((time.perf_counter() - start) * 1000, 1)
+                self.state, self.error = READY, None
+                logger.info(f"Initialized {self.name} in {self.load_ms}ms")
+        return self.value
+
+    def status(self):
+        status = {'state': self.state}
+        if self.load_ms is not None:
+            status['load_ms'] = self.load_ms
+        if self.error:
+            status['error'] = self.error
+        return status
+
+
+def _load_gemini():
+    import google.generativeai as genai
+    genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+    return genai.GenerativeModel('gemini-2.0-flash')
+
+
+def _load_playwright():
+    from playwright.sync_api import sync_playwright
+    return sync_playwright
+
+
+def _load_pandas():
+    import pandas as pd
+    return pd
+
+
+def _load_http():
+    # One keep-alive connection pool shared by every scrape thread
+    import requests
+    from requests.adapters import HTTPAdapter
+    pool_size = int(os.getenv('HTTP_POOL_SIZE', '16'))
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=1))
+    session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=1))
+    return session
+
+
+gemini = LazySubsystem('gemini', _load_gemini)
+playwright = LazySubsystem('playwright', _load_playwright)
+pandas = LazySubsystem('pandas', _load_pandas)
+http = LazySubsystem('http', _load_http)
+
+ALL = [gemini, playwright, pandas, http]
+
+
+def warm_up(names=None):
+    """Initialize the named subsystems (default: all); returns their statuses."""
+    for subsystem in ALL:
+        if names is None or subsystem.name in names:
+            try:
+                subsystem.get()
+            except Exception:
+                pass
+    return statuses()
+
+
+def statuses():
+    return {subsystem.name: subsystem.status() for subsystem in ALL}
@@ -0,0 +1,51 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'maps')
+
+# Stand-in for the Maps pages the HTTP engine fetches: path prefix -> recorded page
+ROUTES = [
+    ('/maps/search/broken', 'no_state.html'),
+    ('/maps/search/', 'search.html'),
+    ('/maps/place/', 'place.html'),
+]
+
+
+class MapsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        fixture = next((name for prefix, name in ROUTES if self.path.startswith(prefix)), None)
+        if fixture is None:
+            self.send_error(404)
+            return
+        with open(os.path.join(FIXTURES, fixture), 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def maps_server(monkeypatch):
+    """Serve the recorded pages on a local port and point MAPS_BASE_URL at it."""
+    import extraction
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MapsHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(extraction, 'MAPS_BASE_URL', f"http://127.0.0.1:{server.server_address[1]}")
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+import admission
+
+
+def make_controller(capacity, **kwargs):
+    return admission.AdmissionController(ram_budget_mb=capacity * 400, browser_ram_mb=400, **kwargs)
+
+
+def wait_until_queued(controller, depth):
+    deadline = time.monotonic() + 5
+    while len(controller.queue) < depth:
+        assert time.monotonic() < deadline, "request never queued"
+        time.sleep(0.005)
+
+
+def test_client_id_header_needs_its_key():
+    keys = {'partner': 'secret'}
+
+    assert admission.client_identity({'X-Client-ID': 'partner'}, '10.0.0.1', keys) == '10.0.0.1'
+    assert admission.client_identity({'X-Client-ID': 'partner', 'X-Client-Key': 'guess'}, '10.0.0.1', keys) == '10.0.0.1'
+    assert admission.client_identity({'X-Client-ID': 'rotated-1'}, '10.0.0.1', keys) == '10.0.0.1'
+    assert admission.client_identity({'X-Client-ID': 'partner', 'X-Client-Key': 'secret'}, '10.0.0.1', keys) == 'partner'
+    assert admission.client_identity({}, None, keys) == 'anonymous'
+
+
+def test_cheap_requests_overtake_a_heavy_client():
+    controller = make_controller(1)
+    busy = controller.acquire('other', timeout=0)
+    order = []
+
+    def request(client, cost):
+        slot = controller.acquire(client, cost=cost, timeout=5)
+        order.append(client)
+        slot.release()
+
+    threads = []
+    for depth, (client, cost) in enumerate([('heavy', 50), ('heavy', 50), ('light', 1)], start=1):
+        thread = threading.Thread(target=request, args=(client, cost))
+        thread.start()
+        threads.append(thread)
+        wait_until_queued(controller, depth)
+    busy.release()
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ['light', 'heavy', 'heavy']
+
+
+def test_per_client_queue_limit():
+    controller = make_controller(1, max_client_queue=1)
+    busy = controller.acquire('other', timeout=0)
+    waiting = threading.Thread(target=lambda: controller.acquire('client', timeout=1).release())
+    waiting.start()
+    wait_until_queued(controller, 1)
+
+    with pytest.raises(admission.AdmissionRejected):
+        controller.acquire('client', timeout=1)
+    # Another client still gets in line
+    other = threading.Thread(target=lambda: controller.acquire('someone-else', timeout=1).release())
+    other.start()
+    wait_until_queued(controller, 2)
+
+    busy.release()
+    waiting.join(5)
+    other.join(5)
+
+
+def test_rejected_requests_do_not_push_the_client_back():
+    controller = make_controller(1)
+    busy = controller.acquire('other', timeout=0)
+
+    with pytest.raises(admission.AdmissionRejected):
+        controller.acquire('client', cost=50, timeout=0.01)
+
+    assert 'client' not in controller.last_tag
+    busy.release()
+
+
+def test_finish_tags_behind_the_virtual_time_are_pruned():
+    controller = make_controller(1)
+    for i in range(100):
+        controller.acquire(f"client-{i}", cost=1, timeout=0).release()
+
+    assert len(controller.last_tag) <= 1
+
+
+def test_requests_holding_a_speculative_slot_do_not_deadlock():
+    controller = make_controller(2)
+    speculative = [controller.acquire(client, cost=5, timeout=0) for client in ('a', 'b')]
+
+    # Waiting for the rest while holding a slot: each needs the slot the other holds
+    with pytest.raises(admission.AdmissionRejected):
+        controller.acquire('a', cost=0, browsers=2, timeout=0.05)
+
+    # What /scrape does instead: take the rest at once, or release and queue for everything
+    granted = []
+
+    def scrape(client, held):
+        try:
+            slot = controller.acquire(client, cost=0, browsers=1, timeout=0)
+            held = [held, slot]
+        except admission.AdmissionRejected:
+            held.release()
+            held = [controller.acquire(client, cost=0, browsers=2, timeout=5)]
+        granted.append(client)
+        time.sleep(0.01)
+        for slot in held:
+            slot.release()
+
+    threads = [threading.Thread(target=scrape, args=(client, slot)) for client, slot in zip(('a', 'b'), speculative)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert sorted(granted) == ['a', 'b']
+    assert controller.in_use == 0
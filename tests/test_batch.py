@@ -0,0 +1,77 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('dotenv')
+
+import main
+import subsystems
+
+
+class FakeListing:
+    def __init__(self, name, page):
+        self.name = name
+        self.page = page
+
+    def click(self):
+        if self.name is None:
+            raise TimeoutError("listing detached")
+        self.page.open = self.name
+
+
+class FakePage:
+    url = 'https://www.google.com/maps/place/x/@17.4,78.4,15z'
+    open = None
+
+    def locator(self, xpath):
+        return SimpleNamespace(count=lambda: 1, inner_text=lambda: self.open)
+
+    def wait_for_timeout(self, ms):
+        pass
+
+    keyboard = SimpleNamespace(press=lambda key: None)
+
+
+@pytest.fixture
+def maps(monkeypatch):
+    """Stand in for Playwright and Gemini; returns the listing names the search shows (None fails to open)."""
+    page = FakePage()
+    names = []
+    browser = SimpleNamespace(new_page=lambda: page, close=lambda: None)
+
+    class FakePlaywright:
+        def __enter__(self):
+            return SimpleNamespace(chromium=SimpleNamespace(launch=lambda headless: browser))
+
+        def __exit__(self, *args):
+            pass
+
+    monkeypatch.setattr(subsystems.playwright, 'get', lambda: FakePlaywright)
+    monkeypatch.setattr(main, 'open_search', lambda page, full_search: None)
+    monkeypatch.setattr(main, 'scroll_feed', lambda page, total: ([FakeListing(n, page) for n in names[:total]], True))
+    monkeypatch.setattr(main, 'generate_job_suggestions', lambda name, *args: [{'jobTitle': f"Cook at {name}"}])
+    return names
+
+
+def test_failed_listing_does_not_lose_the_rest(maps):
+    maps.extend(['Paradise Biryani', None, 'Karachi Bakery'])
+
+    records = main.scrape_listings('restaurant', 'Hyderabad', 3, verbose=False)
+
+    assert [record['Business Name'] for record in records] == ['Paradise Biryani', 'Karachi Bakery']
+
+
+def test_batch_parses_prompts_locally_and_writes_postings(maps, monkeypatch, tmp_path):
+    maps.append('Paradise Biryani')
+    monkeypatch.setattr(main, 'get_model', lambda: pytest.fail("confident prompt sent to Gemini"))
+    source = tmp_path / 'prompts.txt'
+    source.write_text("I am a cook looking for restaurant work in Hyderabad\n", encoding='utf-8')
+    output = tmp_path / 'out.jsonl'
+
+    status = main.run_batch(main.parse_args(['batch', str(source), '-o', str(output), '-t', '1']))
+
+    assert status == 0
+    record = json.loads(output.read_text(encoding='utf-8'))
+    assert record['location'] == 'Hyderabad'
+    assert record['Job Suggestions'] == [{'jobTitle': 'Cook at Paradise Biryani'}]
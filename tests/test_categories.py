@@ -0,0 +1,65 @@
+import pytest
+
+
+@pytest.fixture
+def core(monkeypatch, tmp_path):
+    pytest.importorskip('dotenv')
+    import scraper
+    import result_store
+    import storage
+
+    monkeypatch.setattr(result_store, 'DB_PATH', str(tmp_path / 'job_genie.db'))
+    monkeypatch.setattr(storage, 'save_results', lambda records, *args, **kwargs: None)
+    return scraper
+
+
+def fake_scrape_jobs(listings, scraped):
+    """scrape_jobs() over fixed per-category listings, recording every place it scrapes (and so enriches)."""
+    def scrape_jobs(business_type, location, total=5, session=None, **kwargs):
+        records = []
+        for name in listings[business_type][:total]:
+            records.append({'Business Name': name, 'Coordinates': name, 'Location URL': name})
+            scraped.append((business_type, name))
+        return records, business_type, location
+    return scrape_jobs
+
+
+def test_categories_split_total_between_them(core, monkeypatch):
+    listings = {
+        'restaurant': ['r1', 'r2', 'r3', 'r4'],
+        'hotel': ['h1', 'h2', 'h3', 'h4'],
+        'catering service': ['c1', 'c2', 'c3', 'c4'],
+    }
+    scraped = []
+    monkeypatch.setattr(core, 'scrape_jobs', fake_scrape_jobs(listings, scraped))
+
+    records, _, _ = core.scrape_categories(list(listings), 'Hyderabad', 5)
+
+    assert [record['Business Name'] for record in records] == ['r1', 'h1', 'c1', 'r2', 'h2']
+    # No more places scraped, and so enriched, than returned
+    assert len(scraped) == 5
+
+
+def test_duplicates_are_topped_up_from_the_best_ranked_category(core, monkeypatch):
+    listings = {
+        'restaurant': ['r1', 'r2', 'r3', 'r4'],
+        'hotel': ['r1', 'h2', 'h3'],
+    }
+    scraped = []
+    monkeypatch.setattr(core, 'scrape_jobs', fake_scrape_jobs(listings, scraped))
+
+    records, _, _ = core.scrape_categories(list(listings), 'Hyderabad', 4)
+
+    assert sorted(record['Business Name'] for record in records) == ['h2', 'r1', 'r2', 'r3']
+    assert ('restaurant', 'r3') in scraped
+
+
+def test_categories_beyond_total_are_not_searched(core, monkeypatch):
+    listings = {'restaurant': ['r1', 'r2'], 'hotel': ['h1'], 'catering service': ['c1']}
+    scraped = []
+    monkeypatch.setattr(core, 'scrape_jobs', fake_scrape_jobs(listings, scraped))
+
+    records, _, _ = core.scrape_categories(list(listings), 'Hyderabad', 2)
+
+    assert [record['Business Name'] for record in records] == ['r1', 'h1']
+    assert {business_type for business_type, _ in scraped} == {'restaurant', 'hotel'}
@@ -0,0 +1,50 @@
+import pytest
+
+import result_store
+from deferred import DeferredScrape
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(result_store, 'DB_PATH', str(tmp_path / 'job_genie.db'))
+
+
+def failing_scrape(business_type, location, total, on_update):
+    on_update([{'Business Name': 'Paradise Biryani'}])
+    raise RuntimeError("Browser crashed")
+
+
+def test_failed_scrape_keeps_its_results_and_records_the_error():
+    run = DeferredScrape(failing_scrape, 'restaurant', 'Hyderabad', 5).start()
+
+    results, complete = run.wait(5)
+
+    assert complete
+    assert results == [{'Business Name': 'Paradise Biryani'}]
+    result_set = result_store.get_result_set(run.result_id)
+    assert result_set['complete']
+    assert result_set['error'] == "Browser crashed"
+    assert result_set['results'] == results
+
+
+def test_results_endpoint_reports_the_error():
+    pytest.importorskip('flask')
+    pytest.importorskip('dotenv')
+    import app
+
+    run = DeferredScrape(failing_scrape, 'restaurant', 'Hyderabad', 5).start()
+    run.wait(5)
+
+    page = app.app.test_client().get(f"/results/{run.result_id}").get_json()
+
+    assert page['complete']
+    assert page['scrape_error'] == "Browser crashed"
+    assert page['total_results'] == 1
+
+
+def test_successful_scrape_has_no_error():
+    run = DeferredScrape(lambda business_type, location, total, on_update: ([], business_type, location),
+                         'restaurant', 'Hyderabad', 5).start()
+    run.wait(5)
+
+    assert result_store.get_result_set(run.result_id)['error'] is None
@@ -0,0 +1,51 @@
+import gzip
+import os
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('dotenv')
+
+import app
+import delivery
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'js', 'script.js')
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(delivery, 'brotli', None)
+    monkeypatch.setattr(delivery, '_static_cache', {})
+    return app.app.test_client()
+
+
+def test_static_files_are_compressed_once(client):
+    with open(SCRIPT, 'rb') as f:
+        script = f.read()
+
+    first = client.get('/static/js/script.js', headers={'Accept-Encoding': 'gzip'})
+    second = client.get('/static/js/script.js', headers={'Accept-Encoding': 'gzip'})
+
+    for response in (first, second):
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.data) == script
+        assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(delivery._static_cache) == 1
+
+
+def test_compressed_static_file_revalidates(client):
+    etag = client.get('/static/js/script.js', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+
+    response = client.get('/static/js/script.js', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+    assert etag.startswith('W/')
+    assert response.status_code == 304
+
+
+def test_static_file_without_accept_encoding_is_sent_as_is(client):
+    response = client.get('/static/js/script.js')
+
+    assert 'Content-Encoding' not in response.headers
+    with open(SCRIPT, 'rb') as f:
+        assert response.data == f.read()
+    response.close()
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('requests')
+
+import extraction
+
+
+def test_search_reads_places_from_recorded_page(maps_server):
+    places, exhausted = extraction.HttpExtractor().search('restaurant in Hyderabad', 'Restaurant')
+
+    assert [place['name'] for place in places] == ["Chai Point Banjara Hills", "Paradise Biryani", "Karachi Bakery"]
+    assert places[1]['coordinates'] == "17.4416, 78.4983"
+    assert places[1]['phone'] == "040 6640 0000"
+    assert places[1]['category'] == "Restaurant"
+    assert places[1]['description'] == "Hyderabadi biryani since 1953"
+    assert places[0]['place_url'].startswith(f"{extraction.MAPS_BASE_URL}/maps/place/")
+    # Fewer than a full feed page
+    assert exhausted
+    assert maps_server.requests[0].startswith('/maps/search/restaurant%20in%20Hyderabad')
+
+
+def test_search_within_viewport(maps_server):
+    extraction.HttpExtractor().search('cafe', 'Cafe', (17.4, 78.45, 14))
+
+    assert maps_server.requests[0].startswith('/maps/search/cafe/@17.400000,78.450000,14z')
+
+
+def test_place_keeps_the_url_it_was_asked_for(maps_server):
+    place_url = f"{extraction.MAPS_BASE_URL}/maps/place/Paradise+Biryani/data=!4m2!3m1!1s0x3bcb92:0x2b3c"
+
+    place = extraction.HttpExtractor().place(place_url, 'Restaurant')
+
+    assert place['name'] == "Paradise Biryani"
+    assert place['place_url'] == place['location_url'] == place_url
+    assert place['phone'] == "040 6640 0000"
+
+
+def test_page_without_embedded_state_raises(maps_server):
+    with pytest.raises(extraction.ExtractionError):
+        extraction.HttpExtractor().search('broken in Hyderabad')
+
+
+def test_unreachable_server_raises(monkeypatch):
+    monkeypatch.setattr(extraction, 'MAPS_BASE_URL', 'http://127.0.0.1:9')
+
+    with pytest.raises(extraction.ExtractionError):
+        extraction.HttpExtractor().search('restaurant in Hyderabad')
+
+
+class FakeListing:
+    def __init__(self, page, href):
+        self.page = page
+        self.href = href
+
+    def get_attribute(self, name):
+        return self.href
+
+    def click(self):
+        self.page.opened.append(self.href)
+
+
+class FakePage:
+    """Just enough of a Playwright page for scrape_jobs() once the feed is scrolled."""
+
+    def __init__(self, hrefs):
+        self.listings = [FakeListing(self, href) for href in hrefs]
+        self.opened = []
+        self.keyboard = SimpleNamespace(press=lambda key: None)
+
+    def wait_for_timeout(self, ms):
+        pass
+
+    def goto(self, url, timeout=None):
+        self.opened.append(url)
+
+    def locator(self, xpath):
+        name = f"Browser place {len(self.opened)}"
+        return SimpleNamespace(count=lambda: 1, inner_text=lambda: name)
+
+
+@pytest.fixture
+def core(monkeypatch, tmp_path):
+    pytest.importorskip('dotenv')
+    import scraper
+    import result_store
+
+    monkeypatch.setattr(result_store, 'DB_PATH', str(tmp_path / 'job_genie.db'))
+    monkeypatch.setattr(extraction, 'EXTRACTION_ENGINE', 'http')
+    monkeypatch.setattr(scraper, 'generate_job_suggestions', lambda *args: [])
+    monkeypatch.setattr(scraper, 'scroll_feed', lambda page, total: (page.listings[:total], len(page.listings) <= total))
+    monkeypatch.setattr(scraper, 'extract_place', lambda page, name, category: {
+        'place_url': page.opened[-1],
+        'location_url': page.opened[-1],
+        'name': name,
+        'coordinates': "17.4, 78.4",
+        'phone': "Not found",
+        'category': category,
+        'description': "",
+    })
+    return scraper
+
+
+def test_scrape_jobs_falls_back_to_the_browser(core, maps_server):
+    page = FakePage(['https://www.google.com/maps/place/a', 'https://www.google.com/maps/place/b'])
+
+    records, _, _ = core.scrape_jobs('broken', 'Hyderabad', 2, session=core.new_session('broken', 'Hyderabad'),
+                                     persist=False, page=page, searched='broken in Hyderabad')
+
+    assert [record['Business Name'] for record in records] == ["Browser place 1", "Browser place 2"]
+    assert page.opened == ['https://www.google.com/maps/place/a', 'https://www.google.com/maps/place/b']
+
+
+def test_scrape_jobs_reads_a_short_feed_over_http_without_exhausting_the_session(core, maps_server):
+    session = core.new_session('restaurant', 'Hyderabad')
+
+    records, _, _ = core.scrape_jobs('restaurant', 'Hyderabad', 5, session=session, persist=False)
+
+    assert len(records) == 3
+    assert all(record['Postings Status'] == core.READY_POSTINGS for record in records)
+    assert not session['exhausted']
+
+    # Asking for more must scroll the feed in the browser rather than stop at the first HTTP page
+    page = FakePage(session['place_urls'] + ['https://www.google.com/maps/place/d'])
+    records, _, _ = core.scrape_jobs('restaurant', 'Hyderabad', 5, session=session, persist=False,
+                                     page=page, searched='restaurant in Hyderabad')
+
+    assert len(records) == 4
+    assert page.opened == ['https://www.google.com/maps/place/d']
+    assert session['exhausted']
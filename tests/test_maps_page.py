@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+import maps_page
+
+PLACE_URL = 'https://www.google.com/maps/place/Paradise+Biryani/@17.4416,78.4983,17z'
+PANEL = {
+    maps_page.PHONE_XPATH: "040 6640 0000",
+    maps_page.DESCRIPTION_XPATH: "Hyderabadi biryani since 1953",
+}
+
+
+class SyncPage:
+    """An open place panel, and a results feed that grows by `step` places per scroll up to `available`."""
+    url = PLACE_URL
+
+    def __init__(self, available=0, step=3):
+        self.available = available
+        self.step = step
+        self.listed = 0
+        self.mouse = SimpleNamespace(wheel=self.wheel)
+
+    def wheel(self, x, y):
+        self.listed = min(self.listed + self.step, self.available)
+
+    def wait_for_timeout(self, ms):
+        pass
+
+    def locator(self, xpath):
+        if xpath == maps_page.PLACE_LINK_XPATH:
+            return SimpleNamespace(count=lambda: self.listed, all=lambda: list(range(self.listed)))
+        text = PANEL.get(xpath)
+        return SimpleNamespace(count=lambda: int(text is not None), inner_text=lambda: text)
+
+
+def awaitable(value):
+    async def result(*args):
+        return value(*args) if callable(value) else value
+    return result
+
+
+class AsyncPage(SyncPage):
+    """The same page through Playwright's async API."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.mouse = SimpleNamespace(wheel=awaitable(self.wheel))
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+    def locator(self, xpath):
+        locator = super().locator(xpath)
+        methods = {name: awaitable(method) for name, method in vars(locator).items()}
+        return SimpleNamespace(first=SimpleNamespace(**methods), **methods)
+
+
+def test_async_extraction_reads_the_same_fields():
+    place = maps_page.extract_place(SyncPage(), "Paradise Biryani", "Restaurant")
+
+    assert asyncio.run(maps_page.extract_place_async(AsyncPage(), "Paradise Biryani", "Restaurant")) == place
+    assert place['coordinates'] == "17.4416, 78.4983"
+    assert place['phone'] == "040 6640 0000"
+    # No category button on the panel
+    assert place['category'] == "Restaurant"
+
+
+def test_async_scroll_stops_where_the_sync_one_does():
+    for available, total in [(10, 5), (4, 5)]:
+        listings, exhausted = maps_page.scroll_feed(SyncPage(available), total)
+
+        assert asyncio.run(maps_page.scroll_feed_async(AsyncPage(available), total)) == (listings, exhausted)
+        assert len(listings) == min(available, total)
+        assert exhausted == (available < total)
@@ -0,0 +1,61 @@
+import os
+import time
+
+import pytest
+
+import profiling
+
+
+@pytest.fixture
+def profile_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def make_profile(profile_dir, request_id, age_hours=0, finished=True):
+    directory = profile_dir / request_id
+    directory.mkdir()
+    (directory / profiling.PLAYWRIGHT_TRACE).write_bytes(b'trace')
+    if finished:
+        (directory / profiling.META).write_text('{}', encoding='utf-8')
+    modified = time.time() - age_hours * 3600
+    os.utime(directory, (modified, modified))
+
+
+def test_admin_token_must_match(monkeypatch):
+    monkeypatch.setattr(profiling, 'ADMIN_TOKEN', 'secret')
+
+    assert profiling.is_admin({'X-Admin-Token': 'secret'})
+    assert not profiling.is_admin({'X-Admin-Token': 'guess'})
+    assert not profiling.is_admin({})
+    monkeypatch.setattr(profiling, 'ADMIN_TOKEN', None)
+    assert not profiling.is_admin({'X-Admin-Token': ''})
+
+
+def test_prune_keeps_the_newest_profiles(profile_dir):
+    for age, request_id in enumerate(['newest', 'newer', 'old', 'oldest']):
+        make_profile(profile_dir, request_id, age_hours=age)
+
+    assert profiling.prune_profiles(max_count=2, max_age_hours=72) == 2
+
+    assert sorted(os.listdir(profile_dir)) == ['newer', 'newest']
+
+
+def test_prune_spares_profiles_in_progress_until_they_expire(profile_dir):
+    make_profile(profile_dir, 'running', finished=False)
+    make_profile(profile_dir, 'abandoned', age_hours=100, finished=False)
+
+    profiling.prune_profiles(max_count=0, max_age_hours=72)
+
+    assert os.listdir(profile_dir) == ['running']
+
+
+def test_client_request_id_does_not_name_the_profile(profile_dir, monkeypatch):
+    pytest.importorskip('flask')
+    pytest.importorskip('dotenv')
+    import app
+
+    with app.app.test_request_context(headers={'X-Request-ID': 'victim'}):
+        app.assign_request_id()
+        assert app.g.request_id != 'victim'
+        assert app.g.client_request_id == 'victim'
@@ -0,0 +1,58 @@
+import pytest
+
+from prompt_parser import lookup_city, parse_prompt
+
+LOCAL_PARSER_MIN_CONFIDENCE = pytest.importorskip('prompts').LOCAL_PARSER_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize('prompt, business_type, location', [
+    ("I am a cook looking for work in Hyderabad", 'restaurant', 'Hyderabad'),
+    ("electrician jobs near Pune", 'electrical contractor', 'Pune'),
+])
+def test_skill_and_city_after_a_preposition_resolve_locally(prompt, business_type, location):
+    analysis = parse_prompt(prompt)
+
+    assert analysis.business_type == business_type
+    assert analysis.location == location
+    assert analysis.confidence >= LOCAL_PARSER_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize('prompt', [
+    # City names that are people's names
+    "My name is Anand and I am a cook",
+    "I am Sagar, electrician with 5 years experience",
+    # Where someone is from is not where they want to work
+    "I am a cook from Patna",
+    # Several cities: let Gemini pick
+    "cook jobs in Chennai or Madurai",
+])
+def test_ambiguous_locations_go_to_gemini(prompt):
+    assert parse_prompt(prompt).confidence < LOCAL_PARSER_MIN_CONFIDENCE
+
+
+def test_city_after_a_preposition_is_the_guess_among_several():
+    analysis = parse_prompt("cook from Patna looking for work in Mumbai")
+
+    assert analysis.location == 'Mumbai'
+    assert analysis.confidence < LOCAL_PARSER_MIN_CONFIDENCE
+
+
+def test_job_without_a_skill_goes_to_gemini():
+    analysis = parse_prompt("job in Hyderabad")
+
+    assert analysis.location == 'Hyderabad'
+    assert analysis.business_type is None
+    assert analysis.confidence < LOCAL_PARSER_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize('name, city', [
+    ("Hyderabad", 'Hyderabad'),
+    ("Hyderabad, Telangana", 'Hyderabad'),
+    ("Bombay", 'Mumbai'),
+    ("near Hyderabad", None),
+    ("Atlantis", None),
+])
+def test_lookup_city(name, city):
+    found = lookup_city(name)
+
+    assert (found and found['name']) == city
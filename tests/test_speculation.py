@@ -0,0 +1,104 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import admission
+import speculation
+import subsystems
+
+
+class FakeBrowser:
+    def __init__(self, closed):
+        self.closed = closed
+
+    def new_context(self):
+        return SimpleNamespace(new_page=lambda: SimpleNamespace(url='about:blank'))
+
+    def close(self):
+        self.closed.set()
+
+
+@pytest.fixture
+def browser_closed(monkeypatch):
+    """Stand in for Playwright; the event is set when the speculative browser closes."""
+    closed = threading.Event()
+
+    class FakePlaywright:
+        def __enter__(self):
+            return SimpleNamespace(chromium=SimpleNamespace(launch=lambda headless: FakeBrowser(closed)))
+
+        def __exit__(self, *args):
+            pass
+
+    monkeypatch.setattr(subsystems.playwright, 'get', lambda: FakePlaywright)
+    return closed
+
+
+@pytest.fixture
+def controller():
+    return admission.AdmissionController(ram_budget_mb=800, browser_ram_mb=400)
+
+
+def start(controller, business_type='cafe', location='Pune'):
+    slot = controller.acquire('client', browsers=1, timeout=0)
+    return speculation.SpeculativeSearch(lambda page, search: None, business_type, location, slot).start()
+
+
+def test_run_scrapes_on_the_speculative_browser_and_releases_its_slot(controller, browser_closed):
+    search = start(controller)
+
+    future = search.run(lambda business_type, location, total, page, searched: searched, 'cafe', 'Pune', 5)
+
+    assert future.result(timeout=5) == 'cafe in Pune'
+    search.thread.join(5)
+    assert controller.in_use == 0
+
+
+def test_cancel_releases_the_slot(controller, browser_closed):
+    search = start(controller)
+
+    search.cancel()
+    search.thread.join(5)
+
+    assert controller.in_use == 0
+    assert search.run(lambda *args, **kwargs: None, 'cafe', 'Pune', 5) is None
+
+
+def test_browser_closed_without_a_decision_hands_its_slot_over(controller, browser_closed, monkeypatch):
+    monkeypatch.setattr(speculation, 'DECISION_TIMEOUT_SECONDS', 0.01)
+    search = start(controller)
+    search.thread.join(5)
+
+    assert search.run(lambda *args, **kwargs: None, 'cafe', 'Pune', 5) is None
+    # The caller scrapes on its own with the slot the speculative browser held
+    assert controller.in_use == 1
+    slot = search.take_slot()
+    assert slot is not None
+    slot.release()
+    assert controller.in_use == 0
+    # Nothing left to release
+    search.cancel()
+    assert controller.in_use == 0
+
+
+def test_scrape_handed_over_as_the_browser_closes_raises_speculation_closed(controller, monkeypatch):
+    handed_over = threading.Event()
+
+    def playwright_that_fails_after_handover():
+        handed_over.wait(5)
+        raise RuntimeError("Chromium did not start")
+
+    monkeypatch.setattr(subsystems.playwright, 'get', playwright_that_fails_after_handover)
+    search = start(controller)
+
+    future = search.run(lambda *args, **kwargs: None, 'cafe', 'Pune', 5)
+    handed_over.set()
+
+    with pytest.raises(speculation.SpeculationClosed):
+        future.result(timeout=5)
+    search.thread.join(5)
+    # The scrape never ran, so the slot is the caller's to retry with
+    assert controller.in_use == 1
+    search.take_slot().release()
+    assert controller.in_use == 0
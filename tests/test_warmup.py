@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.fixture
+def core(monkeypatch, tmp_path):
+    pytest.importorskip('dotenv')
+    import result_store
+    import warmup
+
+    monkeypatch.setattr(result_store, 'DB_PATH', str(tmp_path / 'job_genie.db'))
+    return result_store, warmup
+
+
+def test_budgets_are_charged_per_category_and_enrichment(core, monkeypatch):
+    result_store, warmup = core
+    for business_type in ('restaurant, hotel, catering service', 'restaurant, hotel, catering service', 'cafe', 'bakery'):
+        result_store.log_query(business_type, 'Pune', 5)
+    scraped = []
+
+    def scrape_categories(business_types, location, total, fresh=False, usage=None):
+        scraped.append(', '.join(business_types))
+        # One browser per category; a duplicate enriched and then merged away
+        usage.add(browsers=min(len(business_types), total), enrichments=total + 1)
+        return [{'Business Name': str(i)} for i in range(total)], business_types[0], location
+
+    monkeypatch.setattr(warmup, 'scrape_categories', scrape_categories)
+
+    refreshed = warmup.run_warmup(max_browsers=4, gemini_budget=12)
+
+    assert scraped[0] == 'restaurant, hotel, catering service'
+    # Three browsers and six Gemini calls went to the fan-out query; the next fits, the last does not
+    assert len(refreshed) == 2
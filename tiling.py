@@ -0,0 +1,237 @@
+import argparse
+import logging
+import math
+import os
+import re
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import extraction
+import subsystems
+from maps_page import NAME_XPATH, PLACE_LINK_XPATH, extract_place, scroll_feed
+from prompt_parser import lookup_city
+from scraper import READY_POSTINGS, enrichment_pool, generate_job_suggestions, record_from_place
+
+logger = logging.getLogger(__name__)
+
+TILE_WORKERS = int(os.getenv('TILE_WORKERS', '4'))
+# Area searched around the gazetteer centre of a city, split into TILE_GRID x TILE_GRID tiles to start with
+CITY_RADIUS_KM = float(os.getenv('TILE_CITY_RADIUS_KM', '15'))
+TILE_GRID = int(os.getenv('TILE_GRID', '3'))
+# Each level splits a dense tile into four
+MAX_TILE_DEPTH = int(os.getenv('TILE_MAX_DEPTH', '4'))
+TILED_MAX_TOTAL = int(os.getenv('TILED_MAX_TOTAL', '5000'))
+# Google Maps stops growing a results feed at roughly this many places
+TILE_FEED_LIMIT = 120
+BROWSER_BASE_URL = 'https://www.google.com'
+VIEWPORT_WIDTH_PX = 1280
+
+Tile = namedtuple('Tile', ['lat', 'lng', 'lat_span', 'lng_span', 'depth'])
+
+_PLACE_ID_PATTERNS = [
+    re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)"),
+    re.compile(r"!19s([A-Za-z0-9_-]+)"),
+]
+
+
+def place_id(url):
+    """Stable id of a place from its Maps URL, whichever form the URL takes."""
+    for pattern in _PLACE_ID_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            return match.group(1)
+    return url.split('?')[0]
+
+
+def city_tiles(city, radius_km=CITY_RADIUS_KM, grid=TILE_GRID):
+    lat_span = 2 * radius_km / 111.0
+    lng_span = lat_span / max(math.cos(math.radians(city['lat'])), 0.1)
+    south, west = city['lat'] - lat_span / 2, city['lng'] - lng_span / 2
+    return [
+        Tile(south + (row + 0.5) * lat_span / grid, west + (col + 0.5) * lng_span / grid,
+             lat_span / grid, lng_span / grid, 0)
+        for row in range(grid) for col in range(grid)
+    ]
+
+
+def subdivide(tile):
+    return [
+        Tile(tile.lat + dy * tile.lat_span / 4, tile.lng + dx * tile.lng_span / 4,
+             tile.lat_span / 2, tile.lng_span / 2, tile.depth + 1)
+        for dy in (-1, 1) for dx in (-1, 1)
+    ]
+
+
+def viewport(tile):
+    """(lat, lng, zoom) of a map view about as wide as the tile."""
+    zoom = round(math.log2(VIEWPORT_WIDTH_PX * 360 / (256 * tile.lng_span)))
+    return tile.lat, tile.lng, min(max(zoom, 10), 18)
+
+
+class TiledCrawl:
+    """
+    Collects businesses across a whole city by searching it tile by tile,
+    up to `workers` tiles at a time. A tile whose feed is still full when
+    the search stops is split into four and searched again, so dense areas
+    get smaller viewports. Places are de-duplicated by place id across tiles
+    and categories. `browsers`, if given, is a semaphore each tile holds
+    while it has a browser open, so the crawl stays within a caller's
+    browser budget.
+    """
+
+    def __init__(self, business_types, location, max_places=1000, workers=TILE_WORKERS, enrich=True, browsers=None):
+        self.city = lookup_city(location)
+        if self.city is None:
+            raise ValueError(f"Tiled crawl needs a known city, got {location!r}")
+        self.business_types = business_types
+        self.location = location
+        self.max_places = max_places
+        self.workers = workers
+        self.enrich = enrich
+        self.browsers = browsers
+        self.extractor = extraction.get_extractor()
+        self.lock = threading.Lock()
+        # place id -> record, or None while a tile is still reading it
+        self.places = {}
+        self.enrichments = []
+
+    def full(self):
+        with self.lock:
+            return len(self.places) >= self.max_places
+
+    def claim(self, place):
+        with self.lock:
+            if place in self.places or len(self.places) >= self.max_places:
+                return False
+            self.places[place] = None
+            return True
+
+    def release(self, place):
+        with self.lock:
+            self.places.pop(place, None)
+
+    def add(self, place, details):
+        record = record_from_place(details)
+        with self.lock:
+            self.places[place] = record
+
+        def enrich():
+            job_suggestions = generate_job_suggestions(record['Business Name'], details['category'],
+                                                       record['Coordinates'], record['Description'])
+            with self.lock:
+                record['Job Suggestions'] = job_suggestions
+                record['Postings Status'] = READY_POSTINGS
+
+        if self.enrich:
+            self.enrichments.append(enrichment_pool.submit(enrich))
+        else:
+            record.pop('Postings Status')
+
+    def search_tile(self, business_type, tile):
+        """Collect the tile's places; returns True if the tile looks saturated."""
+        view = viewport(tile)
+        if self.extractor is not None:
+            try:
+                places, exhausted = self.extractor.search(business_type, business_type, view)
+                for details in places:
+                    place = place_id(details['place_url'])
+                    if self.claim(place):
+                        self.add(place, details)
+                return not exhausted
+            except extraction.ExtractionError as e:
+                logger.warning(f"{self.extractor.name} extraction failed for tile {view}, falling back to the browser: {str(e)}")
+        if self.browsers is None:
+            return self.browse_tile(business_type, view)
+        with self.browsers:
+            return self.browse_tile(business_type, view)
+
+    def browse_tile(self, business_type, view):
+        sync_playwright = subsystems.playwright.get()
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            page = browser.new_context().new_page()
+            page.goto(extraction.search_url(business_type, view, BROWSER_BASE_URL), timeout=60000)
+            try:
+                page.wait_for_selector(PLACE_LINK_XPATH, timeout=15000)
+            except Exception:
+                logger.info(f"No {business_type} listed in tile {view}")
+                browser.close()
+                return False
+
+            listings, exhausted = scroll_feed(page, TILE_FEED_LIMIT)
+            for listing in listings:
+                if self.full():
+                    break
+                place = place_id(listing.get_attribute('href') or '')
+                if not self.claim(place):
+                    continue
+                try:
+                    listing.click()
+                    page.wait_for_timeout(3000)
+                    name = page.locator(NAME_XPATH).inner_text() if page.locator(NAME_XPATH).count() > 0 else "Not found"
+                    self.add(place, extract_place(page, name, business_type))
+                    page.keyboard.press("Escape")
+                    page.wait_for_timeout(1000)
+                except Exception as e:
+                    self.release(place)
+                    logger.error(f"Error processing listing in tile {view}: {str(e)}")
+            browser.close()
+        return not exhausted
+
+    def run(self):
+        pending = deque((business_type, tile) for business_type in self.business_types for tile in city_tiles(self.city))
+        running = {}
+        searched = 0
+        logger.info(f"Tiled crawl of {self.business_types} in {self.city['name']}: {len(pending)} tiles, up to {self.max_places} places")
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tile') as pool:
+            while pending or running:
+                while pending and len(running) < self.workers and not self.full():
+                    business_type, tile = pending.popleft()
+                    running[pool.submit(self.search_tile, business_type, tile)] = (business_type, tile)
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    business_type, tile = running.pop(future)
+                    searched += 1
+                    try:
+                        saturated = future.result()
+                    except Exception as e:
+                        logger.error(f"Tile {viewport(tile)} failed: {str(e)}")
+                        continue
+                    if saturated and tile.depth < MAX_TILE_DEPTH:
+                        logger.info(f"Tile {viewport(tile)} is dense, splitting into 4")
+                        pending.extend((business_type, child) for child in subdivide(tile))
+
+        if self.enrichments:
+            wait(self.enrichments)
+        with self.lock:
+            records = [record for record in self.places.values() if record is not None]
+        logger.info(f"Tiled crawl searched {searched} tiles and found {len(records)} places")
+        return records
+
+
+def crawl(business_types, location, max_places=1000, workers=TILE_WORKERS, enrich=True, browsers=None):
+    return TiledCrawl(business_types, location, max_places, workers, enrich, browsers).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect businesses across a whole city by searching it tile by tile")
+    parser.add_argument('location', help="City from the gazetteer, e.g. Hyderabad")
+    parser.add_argument('business_types', nargs='+', help="Business types to search, e.g. restaurant hotel")
+    parser.add_argument('--max-places', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=TILE_WORKERS, help="Tiles searched at once")
+    parser.add_argument('--no-postings', action='store_true', help="Skip Gemini job suggestions")
+    parser.add_argument('-o', '--output', default='tiled_business_jobs', help="Output basename")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    import storage
+    records = crawl(args.business_types, args.location, args.max_places, args.workers, not args.no_postings)
+    storage.save_results(records, args.output)
+
+
+if __name__ == "__main__":
+    main()
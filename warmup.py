@@ -0,0 +1,99 @@
+import argparse
+import logging
+import os
+import time
+from datetime import datetime
+
+import result_store
+from scraper import Usage, scrape_categories
+
+logger = logging.getLogger(__name__)
+
+# Hours (local time, 24h clock) during which the warm-up crawler may run, e.g. "1-6"
+OFF_PEAK_HOURS = os.getenv('WARMUP_OFF_PEAK_HOURS', '1-6')
+
+
+def parse_hours(spec):
+    start, end = (int(h) for h in spec.split('-'))
+    if start <= end:
+        return set(range(start, end + 1))
+    return set(range(start, 24)) | set(range(0, end + 1))
+
+
+def is_off_peak(now=None, spec=OFF_PEAK_HOURS):
+    now = now or datetime.now()
+    return now.hour in parse_hours(spec)
+
+
+def run_warmup(max_browsers=5, gemini_budget=100, window_hours=72, min_total=5):
+    """
+    Refresh the most demanded queries, most popular first, until either the
+    browser budget (one browser per category searched) or the Gemini budget
+    (one call per place enriched) is spent. Returns the list of refreshed
+    queries.
+    """
+    refreshed = []
+    candidates = result_store.popular_queries(window_hours=window_hours, limit=max_browsers * 4)
+    logger.info(f"Warm-up found {len(candidates)} popular queries")
+
+    for business_type, location, total, score in candidates:
+        if max_browsers <= 0:
+            logger.info("Warm-up browser budget exhausted")
+            break
+        total = max(total, min_total)
+        # Fan-out queries are logged as "type a, type b"; each category gets its own browser
+        business_types = business_type.split(', ')
+        browsers = min(len(business_types), total)
+        if browsers > max_browsers:
+            logger.info(f"Skipping {business_type} in {location}: needs {browsers} browsers, {max_browsers} left")
+            continue
+        if total > gemini_budget:
+            logger.info(f"Skipping {business_type} in {location}: needs {total} Gemini calls, {gemini_budget} left")
+            continue
+        if result_store.get_results(business_type, location, total, max_age=result_store.RESULT_TTL_SECONDS / 2) is not None:
+            logger.info(f"Skipping {business_type} in {location}: results still fresh")
+            continue
+
+        logger.info(f"Warming {business_type} in {location} (total={total}, score={score:.2f})")
+        usage = Usage()
+        try:
+            # Fresh so stale records are not reused
+            results, _, _ = scrape_categories(business_types, location, total, fresh=True, usage=usage)
+        except Exception as e:
+            logger.error(f"Warm-up failed for {business_type} in {location}: {str(e)}")
+            continue
+        finally:
+            # Charge what was actually spent, including failed scrapes, top-ups and duplicates
+            max_browsers -= max(usage.browsers, browsers)
+            gemini_budget -= usage.enrichments
+        result_store.save_results(business_type, location, total, results)
+        refreshed.append((business_type, location, total))
+
+    logger.info(f"Warm-up refreshed {len(refreshed)} queries")
+    return refreshed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-crawl popular queries during off-peak hours")
+    parser.add_argument('--max-browsers', type=int, default=5, help="Browser sessions per run")
+    parser.add_argument('--gemini-budget', type=int, default=100, help="Gemini calls per run")
+    parser.add_argument('--window-hours', type=int, default=72, help="How far back to look at demand")
+    parser.add_argument('--daemon', action='store_true', help="Keep running, warming once per off-peak hour")
+    parser.add_argument('--interval', type=int, default=3600, help="Seconds between checks in daemon mode")
+    parser.add_argument('--force', action='store_true', help="Run now even outside off-peak hours")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    while True:
+        if args.force or is_off_peak():
+            run_warmup(args.max_browsers, args.gemini_budget, args.window_hours)
+        else:
+            logger.info(f"Outside off-peak hours ({OFF_PEAK_HOURS}), not warming")
+        if not args.daemon:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
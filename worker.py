@@ -0,0 +1,109 @@
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import uuid
+
+import job_queue
+import result_store
+import tiling
+from scraper import scrape_categories
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Pulls scrape tasks from the shared queue and runs at most `max_browsers`
+    of them at once, each in its own thread. A task may search several
+    categories or tiles at a time, so every Chromium instance the worker
+    opens also takes a permit from one shared semaphore of `max_browsers`.
+    """
+
+    def __init__(self, max_browsers=2, lease_seconds=job_queue.DEFAULT_LEASE_SECONDS, poll_interval=2.0):
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.max_browsers = max_browsers
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+        self.browsers = threading.BoundedSemaphore(max_browsers)
+
+    def _heartbeat(self, task_id, done):
+        # Renew well before expiry so a slow Gemini call never loses the lease
+        while not done.wait(self.lease_seconds / 3):
+            if not job_queue.heartbeat(task_id, self.worker_id, self.lease_seconds):
+                logger.warning(f"Lost lease on task {task_id}")
+                return
+
+    def run_task(self, task):
+        payload = task['payload']
+        logger.info(f"[{self.worker_id}] Running task {task['task_id']} (attempt {task['attempts']}): {payload}")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task['task_id'], done), daemon=True)
+        heartbeat.start()
+        try:
+            business_types = payload.get('business_types') or [payload['business_type']]
+            if payload.get('tiled'):
+                results = tiling.crawl(business_types, payload['location'], payload['total'], browsers=self.browsers)
+                business_type, location = ', '.join(business_types), payload['location']
+            else:
+                results, business_type, location = scrape_categories(business_types, payload['location'], payload['total'],
+                                                                      browsers=self.browsers)
+            result_store.save_results(business_type, location, payload['total'], results)
+            job_queue.complete(task['task_id'], self.worker_id, {
+                'business_type': business_type,
+                'location': location,
+                'results': results
+            })
+        except Exception as e:
+            logger.error(f"Task {task['task_id']} failed: {str(e)}")
+            job_queue.fail(task['task_id'], self.worker_id, str(e))
+        finally:
+            done.set()
+            heartbeat.join()
+
+    def _slot_loop(self):
+        while not self.stopping.is_set():
+            try:
+                task = job_queue.claim(self.worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Failed to claim task: {str(e)}")
+                task = None
+            if task is None:
+                self.stopping.wait(self.poll_interval)
+                continue
+            self.run_task(task)
+
+    def run(self):
+        logger.info(f"Worker {self.worker_id} started with {self.max_browsers} browser slots")
+        slots = [threading.Thread(target=self._slot_loop, name=f"slot-{i}") for i in range(self.max_browsers)]
+        for slot in slots:
+            slot.start()
+        for slot in slots:
+            slot.join()
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self, *args):
+        logger.info("Stopping after in-flight tasks finish")
+        self.stopping.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a scrape worker against the shared task queue")
+    parser.add_argument('--max-browsers', type=int, default=int(os.getenv('WORKER_MAX_BROWSERS', '2')))
+    parser.add_argument('--lease-seconds', type=int, default=job_queue.DEFAULT_LEASE_SECONDS)
+    parser.add_argument('--poll-interval', type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    worker = Worker(args.max_browsers, args.lease_seconds, args.poll_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()